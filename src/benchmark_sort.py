@@ -0,0 +1,312 @@
+import sys
+import gc
+import json
+import math
+import random
+import statistics
+import time as time_module
+
+# Tamanhos padrão da varredura (a linha de comando aceita de 10^2 a 10^7)
+DEFAULT_SIZES = (100, 1000, 10000)
+
+DEFAULT_WARMUPS = 2
+DEFAULT_REPEATS = 15
+
+# Tempo máximo (s) de uma execução de aquecimento; acima disso o caso é pulado
+DEFAULT_MAX_SECONDS = 5.0
+
+# Tolerância relativa da mediana antes de acusar regressão em relação à linha de base
+DEFAULT_TOLERANCE = 0.10
+
+# Quantil da normal padrão para intervalos de confiança de 95%
+Z_95 = 1.959963984540054
+
+def _item(i, complexity):
+    # Mesmo formato dos itens do benchmark do Desafio 4
+    return {'id': f"S_{i}", 'complexity': complexity}
+
+def _random_input(size, rng):
+    return [_item(i, rng.randint(1, 100)) for i in range(size)]
+
+def _sorted_input(size, rng):
+    return [_item(i, i) for i in range(size)]
+
+def _reversed_input(size, rng):
+    return [_item(i, size - i) for i in range(size)]
+
+def _few_unique_input(size, rng):
+    return [_item(i, rng.randint(1, 5)) for i in range(size)]
+
+def _middle_pivot_killer_input(size, rng):
+    """
+    Entrada adversária para quicksort com pivô no elemento do meio: em cada
+    nível, o elemento do meio da lista restante recebe o maior valor ainda
+    disponível, de modo que uma partição ingênua separa apenas o pivô.
+
+    Contra o introsort de `quick_sort` (Desafio 4) o pior caso quadrático não
+    ocorre: a mediana de três (início, meio e fim) descarta o máximo do meio,
+    mas o pivô escolhido ainda fica longe da mediana real e as partições de
+    Hoare saem desbalanceadas. Vários trechos estouram o limite de 2·log2(n)
+    níveis e passam para o heapsort (dezenas deles com n = 10^5), então o
+    caso mede o custo desse fallback, que mantém O(n log n).
+
+    O k-ésimo índice restante é encontrado com uma árvore de Fenwick, em O(n log n).
+    """
+    tree = [0] * (size + 1)
+    for i in range(1, size + 1):
+        tree[i] += 1
+        parent = i + (i & -i)
+        if parent <= size:
+            tree[parent] += tree[i]
+    top_bit = 1 << size.bit_length() if size else 0
+
+    values = [0] * size
+    remaining = size
+    for value in range(size, 0, -1):
+        # Busca na Fenwick pelo (remaining // 2 + 1)-ésimo índice ainda presente
+        k = remaining // 2 + 1
+        position = 0
+        step = top_bit
+        while step:
+            candidate = position + step
+            if candidate <= size and tree[candidate] < k:
+                position = candidate
+                k -= tree[candidate]
+            step >>= 1
+        values[position] = value
+        i = position + 1
+        while i <= size:
+            tree[i] -= 1
+            i += i & -i
+        remaining -= 1
+    return [_item(i, value) for i, value in enumerate(values)]
+
+DISTRIBUTIONS = {
+    'random': _random_input,
+    'sorted': _sorted_input,
+    'reversed': _reversed_input,
+    'few_unique': _few_unique_input,
+    'middle_pivot_killer': _middle_pivot_killer_input,
+}
+
+def generate_input(distribution, size, seed=0):
+    """Gera a lista de entrada do benchmark para a distribuição e o tamanho dados."""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Distribuição desconhecida: '{distribution}'. "
+                         f"Opções: {', '.join(DISTRIBUTIONS)}")
+    return DISTRIBUTIONS[distribution](size, random.Random(seed))
+
+def summarize(samples_ns):
+    """
+    Estatísticas robustas de uma amostra de tempos (ns).
+
+    O intervalo de confiança de 95% da mediana é livre de distribuição:
+    usa as estatísticas de ordem n/2 ± 1.96·√n/2 (aproximação binomial).
+    """
+    ordered = sorted(samples_ns)
+    n = len(ordered)
+    median = statistics.median(ordered)
+    if n >= 2:
+        q1, _, q3 = statistics.quantiles(ordered, n=4, method='inclusive')
+    else:
+        q1 = q3 = ordered[0]
+    half_width = Z_95 * math.sqrt(n) / 2
+    lower = ordered[max(int(math.floor(n / 2 - half_width)), 0)]
+    upper = ordered[min(int(math.ceil(n / 2 + half_width)), n - 1)]
+    return {
+        'runs': n,
+        'median_ns': median,
+        'iqr_ns': q3 - q1,
+        'q1_ns': q1,
+        'q3_ns': q3,
+        'ci95_ns': (lower, upper),
+        'min_ns': ordered[0],
+        'max_ns': ordered[-1],
+    }
+
+def time_algorithm(sort_func, data, warmups=DEFAULT_WARMUPS, repeats=DEFAULT_REPEATS,
+                   max_seconds=DEFAULT_MAX_SECONDS):
+    """
+    Mede um algoritmo de ordenação com aquecimentos e repetições (`perf_counter_ns`).
+
+    Cada execução recebe uma cópia nova da entrada (a cópia fica fora da
+    medição) e o coletor de lixo fica desligado durante a medição.
+
+    Returns:
+        dict: Estatísticas de `summarize`, ou {'skipped': motivo}.
+    """
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        for run in range(warmups + repeats):
+            items = list(data)
+            gc.disable()
+            start = time_module.perf_counter_ns()
+            try:
+                sort_func(items)
+            except RecursionError:
+                return {'skipped': 'RecursionError'}
+            finally:
+                elapsed = time_module.perf_counter_ns() - start
+                if gc_was_enabled:
+                    gc.enable()
+            if run < warmups:
+                if elapsed > max_seconds * 1e9:
+                    return {'skipped': f'aquecimento acima de {max_seconds}s'}
+                continue
+            samples.append(elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if not samples:
+        return {'skipped': 'sem repetições'}
+    return summarize(samples)
+
+def default_algorithms():
+    """Algoritmos do Desafio 4, ordenando os itens do benchmark por complexidade."""
+    import desafio4
+    key_func = lambda item: item['complexity']
+    return {
+        'merge_sort': lambda items: desafio4.merge_sort(items, key_func),
+        'quick_sort': lambda items: desafio4.quick_sort(items, key_func),
+        'native_sort': lambda items: sorted(items, key=key_func),
+    }
+
+def run_benchmark(algorithms=None, sizes=DEFAULT_SIZES, distributions=('random',),
+                  warmups=DEFAULT_WARMUPS, repeats=DEFAULT_REPEATS,
+                  max_seconds=DEFAULT_MAX_SECONDS, seed=0):
+    """
+    Executa a varredura algoritmos × distribuições × tamanhos.
+
+    Args:
+        algorithms (dict): Nome → função que recebe a lista de itens e a ordena.
+            Se None, usa `default_algorithms()`.
+        sizes (iterable): Tamanhos das entradas.
+        distributions (iterable): Nomes em DISTRIBUTIONS.
+        warmups (int): Execuções descartadas antes das medições.
+        repeats (int): Execuções medidas.
+        max_seconds (float): Limite de tempo do aquecimento antes de pular o caso.
+        seed (int): Semente das entradas aleatórias.
+
+    Returns:
+        list: Um dicionário por caso, com algoritmo, distribuição, tamanho e estatísticas.
+    """
+    algorithms = algorithms or default_algorithms()
+    results = []
+    for distribution in distributions:
+        for size in sizes:
+            data = generate_input(distribution, size, seed)
+            for name, sort_func in algorithms.items():
+                stats = time_algorithm(sort_func, data, warmups, repeats, max_seconds)
+                results.append({'algorithm': name, 'distribution': distribution,
+                                'size': size, **stats})
+    return results
+
+def _case_key(result):
+    return f"{result['algorithm']}|{result['distribution']}|{result['size']}"
+
+def save_baseline(results, path):
+    """Grava os resultados como linha de base (JSON)."""
+    baseline = {_case_key(r): r for r in results if 'skipped' not in r}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+    return path
+
+def check_regressions(results, baseline_path, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara os resultados com uma linha de base gravada por `save_baseline`.
+
+    Um caso regrediu quando a mediana atual excede a da linha de base em mais
+    de `tolerance` e os intervalos de confiança não se sobrepõem (o limite
+    inferior atual fica acima do limite superior da linha de base).
+
+    Returns:
+        list: Dicionários com o caso, medianas (ns) e a razão atual/base.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for result in results:
+        reference = baseline.get(_case_key(result))
+        if reference is None or 'skipped' in result:
+            continue
+        ratio = result['median_ns'] / reference['median_ns'] if reference['median_ns'] else math.inf
+        if ratio > 1 + tolerance and result['ci95_ns'][0] > reference['ci95_ns'][1]:
+            regressions.append({'case': _case_key(result), 'baseline_median_ns': reference['median_ns'],
+                                'median_ns': result['median_ns'], 'ratio': ratio})
+    return regressions
+
+def format_results(results):
+    """Tabela de texto com mediana, IQR e IC95% (em ms)."""
+    lines = [f"{'Algoritmo':<14} {'Distribuição':<20} {'N':>9} {'Mediana (ms)':>13} "
+             f"{'IQR (ms)':>10} {'IC95% (ms)':>21}"]
+    for r in results:
+        prefix = f"{r['algorithm']:<14} {r['distribution']:<20} {r['size']:>9}"
+        if 'skipped' in r:
+            lines.append(f"{prefix} {'pulado: ' + r['skipped']:>46}")
+            continue
+        low, high = r['ci95_ns']
+        lines.append(f"{prefix} {r['median_ns'] / 1e6:>13.4f} {r['iqr_ns'] / 1e6:>10.4f} "
+                     f"{f'[{low / 1e6:.4f}, {high / 1e6:.4f}]':>21}")
+    return '\n'.join(lines)
+
+def format_parallel_results(results):
+    """Tabela de texto da vazão da ordenação paralela por número de processos."""
+    lines = [f"{'Processos':>9} {'Mediana (s)':>12} {'Elementos/s':>14} {'Speedup':>8}"]
+    for r in results:
+        lines.append(f"{r['workers']:>9} {r['median_s']:>12.4f} {r['items_per_second']:>14,.0f} "
+                     f"{r['speedup']:>7.2f}x")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark dos algoritmos de ordenação do Desafio 4.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Tamanhos das entradas (ex.: 100 1000 10000 ... 10000000)")
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS),
+                        choices=list(DISTRIBUTIONS))
+    parser.add_argument('--warmups', type=int, default=DEFAULT_WARMUPS)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help="Linha de base (JSON) para checar regressões")
+    parser.add_argument('--save-baseline', help="Grava os resultados como nova linha de base")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--parallel-size', type=int, default=0,
+                        help="Mede a vazão da ordenação paralela do Desafio 4 com N chaves (0 desativa)")
+    parser.add_argument('--max-workers', type=int, default=None,
+                        help="Maior número de processos da medição paralela (padrão: núcleos)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(sizes=args.sizes, distributions=args.distributions,
+                            warmups=args.warmups, repeats=args.repeats,
+                            max_seconds=args.max_seconds, seed=args.seed)
+    print(format_results(results))
+
+    if args.parallel_size:
+        import desafio4
+        parallel_results = desafio4.parallel_sort_throughput(args.parallel_size, args.max_workers,
+                                                             seed=args.seed)
+        print(f"\nOrdenação paralela (memória compartilhada), N={args.parallel_size}:")
+        print(format_parallel_results(parallel_results))
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"\nLinha de base gravada em {args.save_baseline}")
+
+    if args.baseline:
+        regressions = check_regressions(results, args.baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSÕES DETECTADAS:")
+            for r in regressions:
+                print(f"  {r['case']}: {r['baseline_median_ns'] / 1e6:.4f} ms -> "
+                      f"{r['median_ns'] / 1e6:.4f} ms ({r['ratio']:.2f}x)")
+            return 1
+        print("\nNenhuma regressão em relação à linha de base.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import os
+import gc
+import csv
+import json
+import time as time_module
+import logging
+from itertools import islice
+from grafo import SkillGraph
+
+# Número de linhas processadas por lote durante a carga em massa
+DEFAULT_CHUNK_SIZE = 50000
+
+# Separador padrão da coluna de pré-requisitos em arquivos CSV (ex.: "S1;S3")
+PRE_REQ_SEPARATOR = ';'
+
+SUPPORTED_FORMATS = ('csv', 'jsonl', 'json', 'parquet')
+
+def _detect_format(path):
+    """Deduz o formato do catálogo pela extensão do arquivo."""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('ndjson', 'jsonlines'):
+        return 'jsonl'
+    if extension in ('parq', 'pq'):
+        return 'parquet'
+    return extension
+
+def _parse_number(raw):
+    """Converte o texto de uma coluna numérica para int (ou float, se necessário)."""
+    if isinstance(raw, (int, float)):
+        return raw
+    try:
+        return int(raw)
+    except ValueError:
+        return float(raw)
+
+def _parse_pre_reqs(raw, separator):
+    """Normaliza a coluna de pré-requisitos para uma lista de IDs."""
+    if not raw:
+        return []
+    if isinstance(raw, str):
+        return [p.strip() for p in raw.split(separator) if p.strip()]
+    return list(raw)
+
+def _record_to_row(record, separator):
+    """Converte um registro (dict) no formato de linha aceito por `add_skills_bulk`."""
+    return (
+        str(record['id']),
+        record.get('name', ''),
+        _parse_number(record['time']),
+        _parse_number(record['value']),
+        _parse_number(record['complexity']),
+        _parse_pre_reqs(record.get('pre_reqs'), separator),
+        record.get('usage', '')
+    )
+
+def _iter_csv(path, separator):
+    # csv.reader com índices de coluna evita criar um dict por linha
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        position = {name.strip(): i for i, name in enumerate(header)}
+        id_col, time_col = position['id'], position['time']
+        value_col, complexity_col = position['value'], position['complexity']
+        name_col = position.get('name')
+        pre_reqs_col = position.get('pre_reqs')
+        usage_col = position.get('usage')
+        parse_number = _parse_number
+
+        for row in reader:
+            if not row:
+                continue
+            pre_reqs = row[pre_reqs_col] if pre_reqs_col is not None else ''
+            yield (
+                row[id_col],
+                row[name_col] if name_col is not None else '',
+                parse_number(row[time_col]),
+                parse_number(row[value_col]),
+                parse_number(row[complexity_col]),
+                [p.strip() for p in pre_reqs.split(separator) if p.strip()] if pre_reqs else [],
+                row[usage_col] if usage_col is not None else ''
+            )
+
+def _iter_jsonl(path, separator):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield _record_to_row(json.loads(line), separator)
+
+def _iter_json(path, separator):
+    # JSON convencional não permite leitura incremental com a biblioteca padrão;
+    # para catálogos grandes prefira JSON Lines (.jsonl)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('skills', [])
+    for record in data:
+        yield _record_to_row(record, separator)
+
+def _iter_parquet(path, separator):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("A leitura de arquivos Parquet requer o pacote 'pyarrow'.") from e
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=DEFAULT_CHUNK_SIZE):
+        for record in batch.to_pylist():
+            yield _record_to_row(record, separator)
+
+_READERS = {
+    'csv': _iter_csv,
+    'jsonl': _iter_jsonl,
+    'json': _iter_json,
+    'parquet': _iter_parquet,
+}
+
+def iter_catalog_rows(path, file_format=None, pre_req_separator=PRE_REQ_SEPARATOR):
+    """
+    Lê um catálogo de habilidades linha a linha.
+
+    Colunas esperadas: id, name, time, value, complexity, pre_reqs, usage
+    (id, time, value e complexity são obrigatórias). Em colunas de texto,
+    `pre_reqs` é uma lista de IDs separados por `pre_req_separator`.
+
+    Yields:
+        tuple: (skill_id, name, time, value, complexity, pre_reqs, usage)
+
+    Raises:
+        ValueError: Para formatos não suportados ou linhas sem colunas obrigatórias.
+    """
+    file_format = file_format or _detect_format(path)
+    if file_format not in _READERS:
+        raise ValueError(f"Formato de catálogo não suportado: '{file_format}'. "
+                         f"Formatos aceitos: {', '.join(SUPPORTED_FORMATS)}")
+
+    line_number = 0
+    try:
+        for line_number, row in enumerate(_READERS[file_format](path, pre_req_separator), start=1):
+            yield row
+    except (KeyError, ValueError, TypeError, IndexError) as e:
+        raise ValueError(f"Registro {line_number + 1} inválido no catálogo {path}: {e!r}") from e
+
+def load_skill_catalog(path, graph=None, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                       pre_req_separator=PRE_REQ_SEPARATOR):
+    """
+    Carrega em massa um catálogo de habilidades (CSV, JSON Lines, JSON ou Parquet).
+
+    O arquivo é lido de forma incremental e inserido em lotes de `chunk_size`
+    linhas via `SkillGraph.add_skills_bulk`, que monta as listas de adjacência
+    na mesma passada e não registra log por linha. O coletor de lixo cíclico
+    fica suspenso durante a carga. Apenas um resumo (linhas, tempo e vazão)
+    é registrado ao final.
+
+    Args:
+        path (str): Caminho do arquivo de catálogo.
+        graph (SkillGraph): Grafo de destino. Se None, cria um grafo vazio.
+        file_format (str): Formato explícito; se None, é deduzido pela extensão.
+        chunk_size (int): Número de linhas por lote.
+        pre_req_separator (str): Separador de pré-requisitos em colunas de texto.
+
+    Returns:
+        tuple: (grafo carregado, estatísticas da carga)
+    """
+    if graph is None:
+        graph = SkillGraph(initialize=False)
+
+    start = time_module.perf_counter()
+    rows = iter_catalog_rows(path, file_format, pre_req_separator)
+    total_rows = 0
+    chunks = 0
+
+    # A carga cria milhões de contêineres de vida longa; o coletor cíclico
+    # varreria o heap inteiro repetidamente sem liberar nada
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while True:
+            added = graph.add_skills_bulk(islice(rows, chunk_size))
+            if not added:
+                break
+            total_rows += added
+            chunks += 1
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    elapsed = time_module.perf_counter() - start
+    stats = {
+        'path': path,
+        'rows': total_rows,
+        'chunks': chunks,
+        'seconds': elapsed,
+        'rows_per_second': total_rows / elapsed if elapsed > 0 else float('inf')
+    }
+
+    logging.info(f" CATÁLOGO CARREGADO: {path} - {total_rows} habilidades em "
+                 f"{elapsed:.2f} s ({stats['rows_per_second']:.0f} linhas/s)")
+
+    return graph, stats
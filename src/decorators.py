@@ -1,133 +1,638 @@
+import os
+import sys
+import atexit
+import inspect
+import queue
 import time as time_module
 import logging
+import threading
 import tracemalloc
 from functools import wraps
-from collections import defaultdict
+from itertools import count
+from collections import defaultdict, deque, namedtuple, OrderedDict
 
-# Configuração do sistema de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('moh_system.log', encoding='utf-8')
-    ]
-)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_FILE = 'moh_system.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
 
-# Lista global para armazenar resultados de desempenho
-resultados_desempenho = []
+_root_logger = logging.getLogger()
+_log_listener = None
+_log_handlers = []
+_log_destinations = []
+_log_options = None
+_logging_configured = False
 
-def logger(func):
+# Fila multiprocessos (criada sob demanda) pela qual os processos
+# trabalhadores enviam registros ao processo principal
+_mp_log_queue = None
+_mp_log_listener = None
+
+def _build_destinations(log_file, max_bytes, backup_count, console, rotating=True):
+    """Handlers finais (console e arquivo). Sem rotação, o arquivo é aberto em modo append."""
+    from logging.handlers import RotatingFileHandler
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if log_file:
+        if rotating:
+            handlers.append(RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                                backupCount=backup_count, encoding='utf-8'))
+        else:
+            handlers.append(logging.FileHandler(log_file, mode='a', encoding='utf-8', delay=True))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+def _install_handlers(handlers):
+    global _log_handlers
+    for handler in _log_handlers:
+        _root_logger.removeHandler(handler)
+    _log_handlers = handlers
+    for handler in handlers:
+        _root_logger.addHandler(handler)
+
+def configure_logging(level=logging.INFO, log_file=LOG_FILE, max_bytes=LOG_MAX_BYTES,
+                      backup_count=LOG_BACKUP_COUNT, console=True, use_queue=True):
+    """
+    Configura o sistema de logging.
+
+    Com `use_queue=True`, os registros são colocados em uma fila (`QueueHandler`)
+    e gravados por uma thread de fundo (`QueueListener`), de modo que a escrita
+    em disco não bloqueia o código instrumentado. O arquivo usa rotação por
+    tamanho (`RotatingFileHandler`). Chamadas repetidas substituem a
+    configuração anterior.
+
+    A fila é local ao processo: processos criados por fork reconstroem os
+    handlers (veja `_after_fork_in_child`), e pools de processos devem usar
+    `worker_logging_initializer()` para encaminhar os registros ao processo
+    principal.
+
+    Args:
+        level (int): Nível mínimo de log.
+        log_file (str): Arquivo de log; None desativa o arquivo.
+        max_bytes (int): Tamanho máximo do arquivo antes da rotação.
+        backup_count (int): Quantidade de arquivos rotacionados mantidos.
+        console (bool): Se True, também escreve no console.
+        use_queue (bool): Se True, a escrita ocorre em uma thread de fundo.
+    """
+    global _log_listener, _log_destinations, _log_options, _logging_configured
+    from logging.handlers import QueueHandler, QueueListener
+
+    shutdown_logging()
+    _logging_configured = True
+    _log_options = {'log_file': log_file, 'max_bytes': max_bytes,
+                    'backup_count': backup_count, 'console': console}
+    _log_destinations = _build_destinations(**_log_options)
+
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        _log_listener = QueueListener(log_queue, *_log_destinations, respect_handler_level=True)
+        _log_listener.start()
+        _install_handlers([QueueHandler(log_queue)])
+    else:
+        _install_handlers(list(_log_destinations))
+    _root_logger.setLevel(level)
+
+def shutdown_logging():
+    """Esvazia as filas de logs e remove os handlers instalados por `configure_logging`."""
+    global _log_listener, _log_destinations, _mp_log_queue, _mp_log_listener
+
+    _install_handlers([])
+    if _mp_log_listener is not None:
+        _mp_log_listener.stop()
+        _mp_log_listener = None
+        _mp_log_queue = None
+    elif _mp_log_queue is not None:
+        # Processo filho: garante que os registros encaminhados saiam da fila antes do término
+        _mp_log_queue.close()
+        _mp_log_queue.join_thread()
+        _mp_log_queue = None
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+    for handler in _log_destinations:
+        handler.close()
+    _log_destinations = []
+
+def get_log_queue():
+    """
+    Fila multiprocessos cujos registros são gravados pelo processo atual.
+
+    Criada no primeiro uso e drenada por um `QueueListener` próprio, ligado
+    aos mesmos destinos do logging configurado (ou aos handlers do logger
+    raiz, se a aplicação configurou o logging por conta própria).
+    """
+    global _mp_log_queue, _mp_log_listener
+    ensure_logging()
+    if _mp_log_queue is None:
+        import multiprocessing
+        from logging.handlers import QueueListener
+
+        destinations = _log_destinations or [h for h in _root_logger.handlers if h not in _log_handlers]
+        _mp_log_queue = multiprocessing.Queue()
+        _mp_log_listener = QueueListener(_mp_log_queue, *destinations, respect_handler_level=True)
+        _mp_log_listener.start()
+    return _mp_log_queue
+
+def init_worker_logging(log_queue, level=logging.INFO):
+    """
+    Inicializador de processos trabalhadores: substitui os handlers herdados
+    por um `QueueHandler` que envia os registros ao processo principal.
+    """
+    global _log_listener, _log_destinations, _mp_log_listener, _logging_configured
+    from logging.handlers import QueueHandler
+
+    # Objetos herdados do pai (threads de escrita não existem neste processo)
+    _log_listener = None
+    _mp_log_listener = None
+    _log_destinations = []
+    for handler in list(_root_logger.handlers):
+        _root_logger.removeHandler(handler)
+    _install_handlers([QueueHandler(log_queue)])
+    _root_logger.setLevel(level)
+    _logging_configured = True
+
+def worker_logging_initializer():
+    """
+    Par (initializer, initargs) para pools de processos, de modo que os
+    registros dos trabalhadores cheguem ao log do processo principal.
+    """
+    return init_worker_logging, (get_log_queue(), _root_logger.getEffectiveLevel())
+
+def _after_fork_in_child():
+    # A thread do QueueListener não sobrevive ao fork: sem reconstrução, os
+    # registros do filho ficariam presos em uma fila que ninguém esvazia
+    global _log_listener, _log_destinations, _mp_log_listener
+    if _log_listener is None:
+        return
+    _log_listener = None
+    _mp_log_listener = None
+    if _mp_log_queue is not None:
+        from logging.handlers import QueueHandler
+        _log_destinations = []
+        _install_handlers([QueueHandler(_mp_log_queue)])
+    else:
+        # Rotação a partir de vários processos corromperia o arquivo: o filho só acrescenta
+        _log_destinations = _build_destinations(**dict(_log_options, rotating=False))
+        _install_handlers(list(_log_destinations))
+
+def ensure_logging():
+    """
+    Configura o logging padrão na primeira chamada instrumentada.
+
+    Importar este módulo não instala handlers nem cria o arquivo de log. Se a
+    aplicação já configurou o logger raiz (handlers ou nível), a configuração
+    dela é respeitada; caso contrário, aplica `configure_logging()`.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    if not _root_logger.handlers and _root_logger.level == logging.WARNING:
+        configure_logging()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+atexit.register(shutdown_logging)
+
+# Histórico global (limitado) de resultados de desempenho
+PERFORMANCE_HISTORY_SIZE = 1000
+resultados_desempenho = deque(maxlen=PERFORMANCE_HISTORY_SIZE)
+
+# Histogramas de latência por função e estado do profiler
+HISTOGRAM_SUB_BUCKETS = 16
+_histograms = {}
+_performance_lock = threading.Lock()
+_span_state = threading.local()
+_memory_profiling = False
+
+class _Truncated:
+    """Representação truncada de argumentos, formatada apenas se o registro for emitido."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        text = str(self.value)
+        return text[:100] + ('...' if len(text) > 100 else '')
+
+def logger(func=None, *, level=logging.INFO, sample_every=1, top_level_only=False):
     """
     Decorator para logging de execução de funções.
     Registra entrada, saída e parâmetros de cada função.
+
+    O nível é verificado antes de qualquer formatação e os parâmetros só são
+    convertidos em texto se o registro for de fato emitido.
+
+    Pode ser usado como `@logger` ou `@logger(...)`:
+        level (int): Nível dos registros de entrada/saída.
+        sample_every (int): Registra apenas 1 a cada N chamadas (funções muito chamadas).
+        top_level_only (bool): Em funções recursivas, registra apenas a chamada
+            mais externa, com o total de chamadas aninhadas.
+
+    Em funções geradoras, o início e o sucesso são registrados em torno da
+    iteração (no primeiro `next` e no esgotamento), não na criação do gerador.
     """
+    if func is None:
+        return lambda f: logger(f, level=level, sample_every=sample_every, top_level_only=top_level_only)
+
+    name = func.__name__
+    state = threading.local()
+    call_counter = count(1)
+
+    def log_start(args, kwargs):
+        call_number = next(call_counter)
+        emit = (_root_logger.isEnabledFor(level) and
+                (sample_every <= 1 or call_number % sample_every == 1))
+        if emit:
+            if sample_every > 1:
+                _root_logger.log(level, " INICIANDO: %s (chamada %d, amostragem 1/%d) | args: %s | kwargs: %s",
+                                 name, call_number, sample_every, _Truncated(args), _Truncated(kwargs))
+            else:
+                _root_logger.log(level, " INICIANDO: %s | args: %s | kwargs: %s",
+                                 name, _Truncated(args), _Truncated(kwargs))
+        return emit
+
+    def log_success():
+        if top_level_only and state.nested:
+            _root_logger.log(level, " SUCESSO: %s concluída (%d chamadas aninhadas)", name, state.nested)
+        else:
+            _root_logger.log(level, " SUCESSO: %s concluída", name)
+
+    if inspect.isgeneratorfunction(func):
+        # Geradores: o trabalho acontece durante a iteração, não na criação do
+        # objeto gerador, então o início e o sucesso envolvem a iteração completa
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if not _logging_configured:
+                ensure_logging()
+            emit = log_start(args, kwargs)
+            try:
+                result = yield from func(*args, **kwargs)
+            except Exception as e:
+                _root_logger.error(" ERRO em %s: %s", name, e)
+                raise
+            if emit:
+                _root_logger.log(level, " SUCESSO: %s concluída", name)
+            return result
+
+        return generator_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        logging.info(f" INICIANDO: {func.__name__}")
-        if args:
-            # Limitar a exibição de argumentos longos para evitar poluição do log
-            arg_repr = str(args)[:100] + ('...' if len(str(args)) > 100 else '')
-            logging.info(f"   Parâmetros posicionais: {arg_repr}")
-        if kwargs:
-            kwarg_repr = str(kwargs)[:100] + ('...' if len(str(kwargs)) > 100 else '')
-            logging.info(f"   Parâmetros nomeados: {kwarg_repr}")
+        if not _logging_configured:
+            ensure_logging()
+        if top_level_only:
+            depth = getattr(state, 'depth', 0)
+            if depth:
+                state.nested += 1
+                state.depth = depth + 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    state.depth = depth
+            state.depth = 1
+            state.nested = 0
 
         try:
-            result = func(*args, **kwargs)
-            logging.info(f" SUCESSO: {func.__name__} concluída")
+            emit = log_start(args, kwargs)
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _root_logger.error(" ERRO em %s: %s", name, e)
+                raise
+
+            if emit:
+                log_success()
             return result
-        except Exception as e:
-            logging.error(f" ERRO em {func.__name__}: {str(e)}")
-            raise
+        finally:
+            if top_level_only:
+                state.depth = 0
 
     return wrapper
 
-def performance(func):
+class LatencyHistogram:
+    """
+    Histograma log-linear de latências (em nanossegundos), com memória constante.
+
+    Cada oitava (potência de 2) é dividida em HISTOGRAM_SUB_BUCKETS faixas,
+    o que garante erro relativo de ~1/HISTOGRAM_SUB_BUCKETS nos percentis.
+    """
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    @staticmethod
+    def _bucket(value_ns):
+        if value_ns < HISTOGRAM_SUB_BUCKETS:
+            return value_ns
+        exponent = value_ns.bit_length() - 1
+        shift = exponent - HISTOGRAM_SUB_BUCKETS.bit_length() + 1
+        return (exponent << 8) | (value_ns >> shift)
+
+    @staticmethod
+    def _bucket_value(bucket):
+        if bucket < HISTOGRAM_SUB_BUCKETS:
+            return bucket
+        exponent, mantissa = bucket >> 8, bucket & 0xFF
+        shift = exponent - HISTOGRAM_SUB_BUCKETS.bit_length() + 1
+        # Ponto médio da faixa
+        return (mantissa << shift) + (1 << shift) // 2
+
+    def record(self, value_ns):
+        self.buckets[self._bucket(value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+        self.max_ns = max(self.max_ns, value_ns)
+
+    def percentile(self, q):
+        """Retorna o percentil q (0-100) aproximado, em nanossegundos."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-q * self.count // 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(max(self._bucket_value(bucket), self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Resumo em milissegundos: contagem, média, p50, p95, p99 e máximo."""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p95_ms': self.percentile(95) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6
+        }
+
+class _Span:
+    __slots__ = ('name', 'parent', 'depth', 'start_ns', 'memory', 'mem_base', 'peak_seen', 'owns_tracing',
+                 'memory_parent')
+
+def _span_stack():
+    stack = getattr(_span_state, 'stack', None)
+    if stack is None:
+        stack = _span_state.stack = []
+    return stack
+
+def enable_memory_profiling(enabled=True):
+    """Liga/desliga a medição de memória (tracemalloc) em todas as funções com @performance."""
+    global _memory_profiling
+    _memory_profiling = enabled
+
+def performance(func=None, *, memory=False, verbose=True):
     """
     Decorator para monitoramento de performance.
-    Mede tempo de execução e consumo de memória.
+    Mede tempo de execução e, opcionalmente, consumo de memória.
+
+    O tempo é medido com `perf_counter_ns`. Cada chamada abre um span em uma
+    pilha por thread, de modo que chamadas aninhadas registram corretamente
+    o span pai e a profundidade. As durações alimentam um histograma por
+    função (p50/p95/p99, veja `get_performance_summary`) e os registros
+    individuais ficam em um histórico de tamanho limitado.
+
+    A memória (pico via tracemalloc) só é medida com `memory=True` ou após
+    `enable_memory_profiling()`. O tracemalloc é iniciado apenas pelo span
+    mais externo e os picos de spans internos são propagados para o ancestral
+    mais próximo que também mede memória (mesmo com spans sem medição no
+    meio), então o aninhamento não interrompe a medição externa.
+
+    Pode ser usado como `@performance` ou `@performance(memory=True, verbose=False)`.
     """
+    if func is None:
+        return lambda f: performance(f, memory=memory, verbose=verbose)
+
+    name = func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        # Iniciar monitoramento de memória
-        tracemalloc.start()
-        start_time = time_module.time()
+        if not _logging_configured:
+            ensure_logging()
+        stack = _span_stack()
+        span = _Span()
+        span.name = name
+        span.parent = stack[-1] if stack else None
+        span.depth = len(stack)
+        span.memory = memory or _memory_profiling
+        span.owns_tracing = False
+        # Ancestral mais próximo que mede memória: recebe o pico anterior ao reset
+        span.memory_parent = span.parent if span.parent is None or span.parent.memory else span.parent.memory_parent
+
+        if span.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                span.owns_tracing = True
+            current_mem, peak_mem = tracemalloc.get_traced_memory()
+            if span.memory_parent is not None:
+                span.memory_parent.peak_seen = max(span.memory_parent.peak_seen, peak_mem)
+            tracemalloc.reset_peak()
+            span.mem_base = current_mem
+            span.peak_seen = current_mem
 
+        stack.append(span)
+        span.start_ns = time_module.perf_counter_ns()
         try:
             result = func(*args, **kwargs)
+        except Exception as e:
+            _root_logger.error(" ERRO de performance em %s: %s", name, e)
+            raise
+        finally:
+            elapsed_ns = time_module.perf_counter_ns() - span.start_ns
+            stack.pop()
 
-            # Calcular métricas de performance
-            end_time = time_module.time()
-            current_mem, peak_mem = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
+            memory_usage_kb = None
+            if span.memory:
+                peak_mem = max(tracemalloc.get_traced_memory()[1], span.peak_seen)
+                memory_usage_kb = (peak_mem - span.mem_base) / 1024
+                if span.memory_parent is not None:
+                    span.memory_parent.peak_seen = max(span.memory_parent.peak_seen, peak_mem)
+                if span.owns_tracing:
+                    tracemalloc.stop()
 
-            execution_time_ms = 1000 * (end_time - start_time)
-            memory_usage_kb = peak_mem / 1024
+        execution_time_ms = elapsed_ns / 1e6
 
-            # Armazenar resultados
+        # Armazenar resultados
+        with _performance_lock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = _histograms[name] = LatencyHistogram()
+            histogram.record(elapsed_ns)
             resultados_desempenho.append({
-                'funcao': func.__name__,
+                'funcao': name,
                 'tempo_ms': execution_time_ms,
                 'memoria_kb': memory_usage_kb,
+                'parent': span.parent.name if span.parent is not None else None,
+                'depth': span.depth,
                 'timestamp': time_module.time()
             })
 
-            # Log de performance
-            logging.info(f" PERFORMANCE - {func.__name__}: "
-                         f"{execution_time_ms:.2f} ms | "
-                         f"{memory_usage_kb:.2f} KB")
+        memory_text = f"{memory_usage_kb:.2f} KB" if memory_usage_kb is not None else "n/d"
 
-            print(f" {func.__name__} -> "
+        # Log de performance
+        if _root_logger.isEnabledFor(logging.INFO):
+            _root_logger.info(" PERFORMANCE - %s: %.2f ms | %s", name, execution_time_ms, memory_text)
+
+        if verbose:
+            print(f" {name} -> "
                   f"Tempo: {execution_time_ms:.2f} ms | "
-                  f"Memória: {memory_usage_kb:.2f} KB")
+                  f"Memória: {memory_text}")
 
-            return result
-
-        except Exception as e:
-            tracemalloc.stop()
-            logging.error(f" ERRO de performance em {func.__name__}: {str(e)}")
-            raise
+        return result
 
     return wrapper
 
-def memoize(func):
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'bytes'])
+
+_KWARGS_MARK = object()
+
+def _freeze(value):
+    """Converte argumentos mutáveis (listas, dicts, sets) em equivalentes imutáveis."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+def default_key(*args, **kwargs):
+    """
+    Chave de cache padrão. Usa os argumentos diretamente quando são hasheáveis
+    e só converte listas/dicts/sets quando necessário.
+    """
+    key = args
+    if kwargs:
+        key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return _freeze(key)
+
+def version_key(*args, **kwargs):
+    """
+    Chave de cache que substitui objetos com `version_stamp()` (ex.: SkillGraph)
+    pelo seu carimbo de versão, em vez da identidade do objeto. Assim o cache
+    deixa de valer automaticamente quando o grafo é modificado.
+    """
+    args = tuple(arg.version_stamp() if hasattr(arg, 'version_stamp') else arg for arg in args)
+    kwargs = {k: v.version_stamp() if hasattr(v, 'version_stamp') else v for k, v in kwargs.items()}
+    return default_key(*args, **kwargs)
+
+def memoize(func=None, *, maxsize=None, ttl=None, key_func=None):
     """
     Decorator para memoização (cache) de resultados.
     Otimiza funções com chamadas repetitivas.
+
+    Pode ser usado como `@memoize` ou `@memoize(maxsize=..., ttl=..., key_func=...)`.
+
+    Args:
+        maxsize (int): Número máximo de entradas (política LRU). None = ilimitado.
+        ttl (float): Tempo de vida das entradas em segundos. None = sem expiração.
+        key_func (callable): Função que recebe os argumentos e retorna a chave
+            de cache (padrão: `default_key`; veja também `version_key`).
+
+    A leitura de um acerto não adquire o lock (o acesso ao dict é atômico);
+    inserções, remoções e evicções são protegidas por um lock. Sob concorrência,
+    a contagem de acertos é aproximada e chamadas com a mesma chave ausente
+    podem calcular o valor mais de uma vez.
+    A função decorada expõe `cache_info()`, `cache_clear()` e `clear_cache()`.
     """
-    cache = {}
+    if func is None:
+        return lambda f: memoize(f, maxsize=maxsize, ttl=ttl, key_func=key_func)
+
+    make_key = key_func or default_key
+    cache = OrderedDict()
+    lock = threading.Lock()
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+    clock = time_module.monotonic
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        # Criar chave única baseada nos argumentos
-        # Converter argumentos mutáveis (listas, dicts) para imutáveis (tuples, sorted items)
-        key_args = tuple(
-            tuple(sorted(arg.items())) if isinstance(arg, dict) else 
-            tuple(arg) if isinstance(arg, list) else 
-            arg for arg in args
-        )
-        key_kwargs = tuple(sorted(kwargs.items()))
-        key = (key_args, key_kwargs)
-
-        if key not in cache:
-            cache[key] = func(*args, **kwargs)
-            logging.debug(f" CACHE MISS: {func.__name__} - Novo resultado armazenado")
-        else:
-            logging.debug(f" CACHE HIT: {func.__name__} - Resultado recuperado do cache")
+        key = make_key(*args, **kwargs)
+
+        # Caminho rápido (sem lock) para acertos
+        entry = cache.get(key)
+        if entry is not None and (ttl is None or entry[1] > clock()):
+            stats['hits'] += 1
+            if maxsize is not None and lock.acquire(blocking=False):
+                try:
+                    cache.move_to_end(key)
+                except KeyError:
+                    pass
+                finally:
+                    lock.release()
+            return entry[0]
 
-        return cache[key]
+        result = func(*args, **kwargs)
+        size = sys.getsizeof(key) + sys.getsizeof(result)
+        expires_at = clock() + ttl if ttl is not None else None
 
-    # Adicionar método para limpar cache se necessário
-    wrapper.clear_cache = lambda: cache.clear()
+        with lock:
+            stats['misses'] += 1
+            previous = cache.pop(key, None)
+            if previous is not None:
+                stats['bytes'] -= previous[2]
+            cache[key] = (result, expires_at, size)
+            stats['bytes'] += size
+            if maxsize is not None:
+                while len(cache) > maxsize:
+                    _, evicted = cache.popitem(last=False)
+                    stats['bytes'] -= evicted[2]
+                    stats['evictions'] += 1
+
+        if _root_logger.isEnabledFor(logging.DEBUG):
+            logging.debug(" CACHE MISS: %s - Novo resultado armazenado", func.__name__)
+
+        return result
+
+    def cache_info():
+        """Retorna estatísticas do cache (acertos, faltas, evicções, tamanho e bytes aproximados)."""
+        with lock:
+            return CacheInfo(stats['hits'], stats['misses'], stats['evictions'],
+                             maxsize, len(cache), stats['bytes'])
+
+    def cache_clear():
+        """Limpa o cache e zera as estatísticas."""
+        with lock:
+            cache.clear()
+            for name in stats:
+                stats[name] = 0
+
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    # Mantido por compatibilidade
+    wrapper.clear_cache = cache_clear
 
     return wrapper
 
 def get_performance_results():
-    """Retorna a lista global de resultados de desempenho."""
-    return resultados_desempenho
+    """Retorna os registros de desempenho mais recentes (histórico limitado)."""
+    with _performance_lock:
+        return list(resultados_desempenho)
+
+def get_performance_summary():
+    """Retorna, por função, contagem, média e percentis (p50/p95/p99) de tempo em ms."""
+    with _performance_lock:
+        return {name: histogram.summary() for name, histogram in _histograms.items()}
 
 def clear_performance_results():
-    """Limpa a lista global de resultados de desempenho."""
-    global resultados_desempenho
-    resultados_desempenho = []
+    """Limpa o histórico e os histogramas de desempenho."""
+    with _performance_lock:
+        resultados_desempenho.clear()
+        _histograms.clear()
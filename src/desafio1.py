@@ -1,119 +1,428 @@
-import math
-import random
-import itertools
-from decorators import performance, logger, memoize
-from grafo import SkillGraph
+from decorators import performance, logger
+from grafo import as_compiled
+
+# Quantidade máxima de cenários processados por bloco no motor Monte Carlo.
+# Limita a memória da matriz (cenários × caminhos) em simulações grandes.
+MC_CHUNK_SIZE = 10000
+
+def monte_carlo_batch(values, incidence, num_scenarios, rng=None, chunk_size=MC_CHUNK_SIZE):
+    """
+    Motor Monte Carlo vetorizado para avaliar vários caminhos de uma só vez.
+
+    Sorteia uma matriz de perturbações (cenários × habilidades) com
+    V ~ Uniforme[V-10%, V+10%] e avalia todos os caminhos como um produto
+    matricial contra a matriz de incidência (caminhos × habilidades).
+    Os cenários são processados em blocos e as estatísticas são combinadas
+    pelo método de Chan, sem guardar todos os valores simulados.
+
+    Args:
+        values (array-like): Valores base das habilidades, shape (n_habilidades,).
+        incidence (array-like): Matriz 0/1 de incidência, shape (n_caminhos, n_habilidades).
+        num_scenarios (int): Número de cenários simulados.
+        rng (numpy.random.Generator | int | None): Gerador (ou semente) para reprodutibilidade.
+        chunk_size (int): Número de cenários por bloco.
+
+    Returns:
+        tuple: (valores esperados, desvios-padrão), arrays com shape (n_caminhos,).
+    """
+    import numpy as np
+    rng = np.random.default_rng(rng)
+    values = np.asarray(values, dtype=np.float64)
+    incidence = np.asarray(incidence, dtype=np.float64)
+    n_paths = incidence.shape[0]
+
+    # Apenas as habilidades que aparecem em algum caminho precisam ser sorteadas
+    used = np.flatnonzero(incidence.any(axis=0))
+    values = values[used]
+    incidence_t = incidence[:, used].T
+
+    count = 0
+    mean = np.zeros(n_paths)
+    m2 = np.zeros(n_paths)
+
+    while count < num_scenarios:
+        size = min(chunk_size, num_scenarios - count)
+        perturbed = values * rng.uniform(0.9, 1.1, size=(size, values.size))
+        totals = perturbed @ incidence_t
+
+        # Combinação das estatísticas do bloco com as acumuladas (Chan et al.)
+        chunk_mean = totals.mean(axis=0)
+        chunk_m2 = ((totals - chunk_mean) ** 2).sum(axis=0)
+        delta = chunk_mean - mean
+        new_count = count + size
+        mean += delta * size / new_count
+        m2 += chunk_m2 + delta ** 2 * count * size / new_count
+        count = new_count
+
+    return mean, np.sqrt(m2 / count)
+
+# Parâmetros do Monte Carlo adaptativo: cenários por rodada (potência de 2,
+# exigida pelas sequências de Sobol), limites de cenários por caminho e erro
+# padrão relativo alvo da média. O mínimo vale só para os caminhos que
+# terminam a corrida e garante ~5% de precisão relativa no desvio-padrão.
+MC_ADAPTIVE_BATCH = 128
+MC_ADAPTIVE_MIN_SCENARIOS = 512
+MC_ADAPTIVE_MAX_SCENARIOS = 100000
+MC_TARGET_RELATIVE_SE = 0.001
+
+# Quantil da normal padrão usado nos intervalos de confiança da corrida
+MC_RACING_Z = 1.959963984540054
+
+def _uniform_sampler(sampler, dimension, rng):
+    """
+    Retorna uma função `draw(size)` de uniformes (size × dimension) em [0, 1).
+
+    'antithetic' devolve pares (u, 1 - u) empilhados em metades; 'sobol'
+    usa uma sequência de Sobol embaralhada (requer scipy).
+    """
+    import numpy as np
+    if sampler == 'antithetic':
+        def draw(size):
+            half = rng.random((size // 2, dimension))
+            return np.vstack([half, 1.0 - half])
+        return draw
+    if sampler == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError as e:
+            raise ImportError("O amostrador 'sobol' requer scipy; use sampler='antithetic'.") from e
+        engine = qmc.Sobol(d=dimension, scramble=True, seed=rng)
+        return engine.random
+    raise ValueError(f"Amostrador desconhecido: '{sampler}'. Opções: 'antithetic', 'sobol'")
+
+def adaptive_monte_carlo(values, incidence, rng=None, sampler='antithetic',
+                         target_relative_se=MC_TARGET_RELATIVE_SE, batch_size=MC_ADAPTIVE_BATCH,
+                         min_scenarios=MC_ADAPTIVE_MIN_SCENARIOS, max_scenarios=MC_ADAPTIVE_MAX_SCENARIOS,
+                         z=MC_RACING_Z):
+    """
+    Monte Carlo adaptativo com redução de variância e eliminação por corrida.
+
+    Todos os caminhos ainda ativos são avaliados sobre os mesmos sorteios
+    (números aleatórios comuns), gerados em rodadas de `batch_size` cenários
+    por pares antitéticos ou por Sobol. Após cada rodada:
+
+    - um caminho sai da corrida quando o intervalo de confiança da diferença
+      pareada para o líder fica inteiramente acima de zero;
+    - a amostragem termina, depois de ao menos `min_scenarios` cenários, quando
+      resta um único caminho ou quando todo caminho ativo atinge o erro padrão
+      relativo `target_relative_se`; em qualquer caso, ao atingir `max_scenarios`.
+
+    Com pares antitéticos cada observação é a média do par, o que dá erros
+    padrão válidos para o estimador; o desvio-padrão reportado é sempre o do
+    valor do caminho entre cenários individuais. Com Sobol o erro padrão
+    amostral é uma estimativa conservadora.
+
+    Args:
+        values (array-like): Valores base das habilidades, shape (n_habilidades,).
+        incidence (array-like): Matriz 0/1 de incidência, shape (n_caminhos, n_habilidades).
+        rng (numpy.random.Generator | int | None): Gerador (ou semente) para reprodutibilidade.
+        sampler (str): 'antithetic' ou 'sobol'.
+        target_relative_se (float): Erro padrão da média, relativo a ela, que encerra a amostragem.
+        batch_size (int): Cenários por rodada (par, e potência de 2 para Sobol).
+        min_scenarios (int): Mínimo de cenários dos caminhos que chegam ao fim da corrida.
+        max_scenarios (int): Máximo de cenários por caminho.
+        z (float): Quantil da normal dos intervalos de confiança.
+
+    Returns:
+        dict: 'mean', 'std', 'std_error' e 'scenarios' (arrays por caminho),
+        'eliminated' (máscara dos caminhos que saíram da corrida) e
+        'total_draws' (cenários avaliados somados sobre os caminhos).
+    """
+    import numpy as np
+    rng = np.random.default_rng(rng)
+    values = np.asarray(values, dtype=np.float64)
+    incidence = np.asarray(incidence, dtype=np.float64)
+    n_paths = incidence.shape[0]
+    antithetic = sampler == 'antithetic'
+    if batch_size < 2 or batch_size % 2:
+        raise ValueError("batch_size deve ser par e maior que 1")
+
+    used = np.flatnonzero(incidence.any(axis=0))
+    values = values[used]
+    incidence_t = incidence[:, used].T
+    draw = _uniform_sampler(sampler, values.size, rng)
+
+    # Estatísticas dos valores por cenário (para o desvio-padrão reportado)
+    scenarios = np.zeros(n_paths, dtype=np.int64)
+    mean = np.zeros(n_paths)
+    m2 = np.zeros(n_paths)
+    # Somas das observações (pares antitéticos ou cenários) deslocadas pela
+    # média da primeira rodada, com produtos cruzados para as diferenças pareadas
+    shift = None
+    obs_count = 0
+    obs_sum = np.zeros(n_paths)
+    obs_cross = np.zeros((n_paths, n_paths))
+    std_error = np.full(n_paths, np.inf)
+    active = np.arange(n_paths)
+    eliminated = np.zeros(n_paths, dtype=bool)
+
+    while True:
+        size = min(batch_size, max_scenarios - int(scenarios[active[0]]))
+        size -= size % 2
+        if size <= 0:
+            break
+        totals = (values * (0.9 + 0.2 * draw(size))) @ incidence_t[:, active]
+
+        # Combinação das estatísticas da rodada com as acumuladas (Chan et al.)
+        count = scenarios[active]
+        chunk_mean = totals.mean(axis=0)
+        chunk_m2 = ((totals - chunk_mean) ** 2).sum(axis=0)
+        delta = chunk_mean - mean[active]
+        new_count = count + size
+        mean[active] += delta * size / new_count
+        m2[active] += chunk_m2 + delta ** 2 * count * size / new_count
+        scenarios[active] = new_count
+
+        observations = (totals[:size // 2] + totals[size // 2:]) / 2 if antithetic else totals
+        if shift is None:
+            shift = observations.mean(axis=0)
+        centered = observations - shift[active]
+        obs_count += len(observations)
+        obs_sum[active] += centered.sum(axis=0)
+        obs_cross[np.ix_(active, active)] += centered.T @ centered
+
+        if obs_count < 2:
+            continue
+        obs_mean = obs_sum[active] / obs_count
+        cross = obs_cross[np.ix_(active, active)] / obs_count - np.outer(obs_mean, obs_mean)
+        variances = np.clip(np.diag(cross), 0, None) * obs_count / (obs_count - 1)
+        std_error[active] = np.sqrt(variances / obs_count)
+
+        # Corrida: elimina caminhos cuja diferença para o líder é significativa
+        leader = int(np.argmax(mean[active]))
+        diff_var = np.clip(cross[leader, leader] + np.diag(cross) - 2 * cross[leader], 0, None)
+        diff_se = np.sqrt(diff_var * obs_count / (obs_count - 1) / obs_count)
+        gap = mean[active[leader]] - mean[active]
+        tolerance = 1e-9 * abs(mean[active[leader]])
+        beaten = gap > z * diff_se + tolerance
+        eliminated[active[beaten]] = True
+        active = active[~beaten]
+
+        if scenarios[active[0]] < min_scenarios:
+            continue
+        if len(active) == 1:
+            break
+        if np.all(std_error[active] <= target_relative_se * np.abs(mean[active])):
+            break
+
+    return {
+        'mean': mean,
+        'std': np.sqrt(m2 / np.maximum(scenarios, 1)),
+        'std_error': std_error,
+        'scenarios': scenarios,
+        'eliminated': eliminated,
+        'total_draws': int(scenarios.sum()),
+    }
+
+def _dominated(label, labels, k):
+    """Verifica se o rótulo é dominado por pelo menos k rótulos da lista."""
+    time_used, complexity_used, value = label[0], label[1], label[2]
+    count = 0
+    for other in labels:
+        if other[0] <= time_used and other[1] <= complexity_used and other[2] >= value:
+            count += 1
+            if count >= k:
+                return True
+    return False
+
+def constrained_best_paths(graph, target_skill, max_time, max_complexity, top_k=1, roots=None):
+    """
+    Programação Dinâmica com rótulos de Pareto sobre a ordem topológica do grafo.
+
+    Cada rótulo (tempo, complexidade, valor, habilidade, rótulo anterior) representa
+    um caminho parcial que parte de uma habilidade sem pré-requisitos. Rótulos que
+    estouram as restrições são descartados e rótulos dominados por pelo menos
+    `top_k` outros no mesmo nó (menor ou igual tempo e complexidade, maior ou igual
+    valor) são podados, pois nunca fariam parte dos `top_k` melhores caminhos.
+    Os caminhos só são reconstruídos no final, a partir dos rótulos do alvo.
+
+    Args:
+        graph (SkillGraph | CompiledSkillGraph): Grafo de habilidades (ou sua visão compilada).
+        target_skill (str): Habilidade objetivo.
+        max_time (int): Restrição máxima de tempo.
+        max_complexity (int): Restrição máxima de complexidade.
+        top_k (int): Quantidade de melhores caminhos retornados.
+        roots (iterable): Índices das habilidades de partida consideradas. Se None,
+            todas as habilidades sem pré-requisitos (usado para dividir a busca).
+
+    Returns:
+        list: Tuplas (caminho, valor, tempo, complexidade) ordenadas por valor decrescente.
+    """
+    compiled = as_compiled(graph)
+    target = compiled.index.get(target_skill)
+    if target is None:
+        return []
+
+    times = compiled.time.tolist()
+    values = compiled.value.tolist()
+    complexities = compiled.complexity.tolist()
+    has_pre_reqs = compiled.has_pre_reqs.tolist()
+    successors, _ = compiled.adjacency_lists()
+
+    # Apenas habilidades que alcançam o alvo (seus pré-requisitos transitivos) precisam de rótulos
+    reaches_target = compiled.closure_index().ancestors[target] | (1 << target)
+    allowed_roots = None if roots is None else set(roots)
+
+    labels = {}
+    for node in compiled.topological_order().tolist():
+        if not reaches_target >> node & 1:
+            continue
+        node_labels = labels.pop(node, [])
+
+        # Pontos de partida: habilidades sem pré-requisitos
+        if (not has_pre_reqs[node] and times[node] <= max_time and complexities[node] <= max_complexity
+                and (allowed_roots is None or node in allowed_roots)):
+            node_labels.append((times[node], complexities[node], values[node], node, None))
+
+        # Poda de rótulos dominados; a ordenação garante que rótulos
+        # idênticos sejam contados apenas uma vez como dominadores
+        node_labels.sort(key=lambda label: (label[0], label[1], -label[2]))
+        kept = []
+        for label in node_labels:
+            if not _dominated(label, kept, top_k):
+                kept.append(label)
+
+        if node == target:
+            best = sorted(kept, key=lambda label: (-label[2], label[0], label[1]))[:top_k]
+            results = []
+            for label in best:
+                path = []
+                cursor = label
+                while cursor is not None:
+                    path.append(compiled.ids[cursor[3]])
+                    cursor = cursor[4]
+                path.reverse()
+                results.append((path, label[2], label[0], label[1]))
+            return results
+
+        # Estender os rótulos sobreviventes para os dependentes
+        for neighbor in successors[node]:
+            if not reaches_target >> neighbor & 1:
+                continue
+            for label in kept:
+                new_time = label[0] + times[neighbor]
+                new_complexity = label[1] + complexities[neighbor]
+                if new_time <= max_time and new_complexity <= max_complexity:
+                    labels.setdefault(neighbor, []).append(
+                        (new_time, new_complexity, label[2] + values[neighbor], neighbor, label))
+
+    return []
+
+def _best_paths_task(roots, target_skill, max_time, max_complexity, top_k):
+    """Tarefa executada no pool: melhores caminhos partindo apenas de `roots`."""
+    from parallel import worker_graph
+    return constrained_best_paths(worker_graph(), target_skill, max_time, max_complexity,
+                                  top_k=top_k, roots=roots)
+
+def parallel_best_paths(graph, target_skill, max_time, max_complexity, top_k=1, workers=0):
+    """
+    Versão paralela de `constrained_best_paths`, dividida pelas habilidades de partida.
+
+    Cada processo resolve a DP para um subconjunto das raízes que alcançam o
+    alvo e devolve seus `top_k` melhores caminhos. A mescla ordena por valor
+    decrescente e desempata por tempo, complexidade e caminho, de modo que o
+    resultado não depende da ordem de chegada das tarefas.
+
+    Args:
+        workers (int): Número de processos (0 usa todos os núcleos).
+    """
+    from parallel import shared_graph_pool, split_round_robin, resolve_workers
+
+    compiled = as_compiled(graph)
+    target = compiled.index.get(target_skill)
+    if target is None:
+        return []
+
+    reaches_target = compiled.closure_index().ancestors[target] | (1 << target)
+    roots = [i for i in range(len(compiled))
+             if not compiled.has_pre_reqs[i] and reaches_target >> i & 1]
+    chunks = split_round_robin(roots, resolve_workers(workers))
+    if len(chunks) <= 1:
+        return constrained_best_paths(compiled, target_skill, max_time, max_complexity, top_k)
+
+    with shared_graph_pool(graph, len(chunks)) as executor:
+        futures = [executor.submit(_best_paths_task, chunk, target_skill, max_time,
+                                   max_complexity, top_k) for chunk in chunks]
+        candidates = [result for future in futures for result in future.result()]
+
+    candidates.sort(key=lambda c: (-c[1], c[2], c[3], c[0]))
+    return candidates[:top_k]
 
 @performance
 @logger
-def desafio1_max_value_path(graph: SkillGraph, target_skill='S6', max_time=350, max_complexity=30, num_scenarios=1000):
+def desafio1_max_value_path(graph, target_skill='S6', max_time=350, max_complexity=30, num_scenarios=1000, rng=None, top_k=10,
+                            workers=None, adaptive=False, sampler='antithetic',
+                            target_relative_se=MC_TARGET_RELATIVE_SE):
     """
     Calcula o caminho de maior valor esperado até a habilidade alvo (S6) usando 
-    Programação Dinâmica (implícita via busca em grafo) e Simulação Monte Carlo.
+    Programação Dinâmica (rótulos de Pareto na ordem topológica) e Simulação Monte Carlo.
 
     Otimiza a aquisição de habilidades considerando restrições de tempo e complexidade,
     e incerteza no valor das habilidades via Monte Carlo.
 
     Args:
-        graph (SkillGraph): Instância do grafo de habilidades.
+        graph (SkillGraph | CompiledSkillGraph): Grafo de habilidades (ou sua visão compilada).
         target_skill (str): Habilidade objetivo (padrão 'S6').
         max_time (int): Restrição máxima de tempo em horas (padrão 350h).
         max_complexity (int): Restrição máxima de complexidade (padrão 30).
         num_scenarios (int): Número de cenários para simulação Monte Carlo (padrão 1000).
+        rng (numpy.random.Generator | int | None): Gerador ou semente da simulação Monte Carlo.
+        top_k (int): Número de caminhos de maior valor determinístico avaliados no Monte Carlo.
+        workers (int | None): Se informado, divide a DP entre processos (0 usa todos os núcleos).
+        adaptive (bool): Usa `adaptive_monte_carlo` (corrida com números aleatórios
+            comuns) no lugar de `num_scenarios` cenários fixos por caminho.
+        sampler (str): Amostrador do modo adaptativo ('antithetic' ou 'sobol').
+        target_relative_se (float): Erro padrão relativo alvo do modo adaptativo.
 
     Returns:
         dict: Dicionário com soluções determinística e estocástica, incluindo 
-              o desvio-padrão da simulação Monte Carlo.
+              o desvio-padrão da simulação Monte Carlo. `top_paths` traz apenas
+              os até `top_k` caminhos viáveis de maior valor determinístico
+              avaliados no Monte Carlo (não todos os caminhos viáveis), como
+              tuplas (caminho, valor, tempo, complexidade, valor esperado,
+              desvio-padrão), ordenadas pelo valor esperado.
     """
 
-    @memoize
-    def monte_carlo_simulation(selected_skills_tuple):
-        """
-        Simulação Monte Carlo para incerteza nos valores das habilidades.
-        Usa memoização para evitar recálculos desnecessários.
-        Retorna o valor esperado e o desvio-padrão.
-        """
-        selected_skills = list(selected_skills_tuple)
-        values = []
-        for _ in range(num_scenarios):
-            total_value = 0
-            for skill_id in selected_skills:
-                original_value = graph.get_skill_data(skill_id)['value']
-                # Aplicar incerteza: V ~ Uniforme[V-10%, V+10%]
-                perturbed_value = original_value * random.uniform(0.9, 1.1)
-                total_value += perturbed_value
-            values.append(total_value)
-
-        # Cálculo do Valor Esperado
-        expected_value = sum(values) / len(values)
-        
-        # Cálculo do Desvio Padrão (Requisito 2.1)
-        std_dev = math.sqrt(sum((x - expected_value) ** 2 for x in values) / len(values))
-        
-        return expected_value, std_dev
-
-    @logger
-    def find_feasible_paths(current, path, visited, time_used, complexity_used, all_paths):
-        """
-        Busca em profundidade (DFS) para encontrar todos os caminhos viáveis 
-        que terminam na habilidade alvo, respeitando as restrições.
-        """
-        # Se o caminho atual é um caminho completo para o alvo
-        if current == target_skill:
-            all_paths.append(path.copy())
-            return
-
-        visited.add(current)
-
-        # Explorar vizinhos (próximas habilidades)
-        # O grafo (self.graph) aponta de pré-requisito para a habilidade que o requer
-        for neighbor in graph.graph.get(current, []):
-            if neighbor not in visited:
-                skill_data = graph.get_skill_data(neighbor)
-                new_time = time_used + skill_data['time']
-                new_complexity = complexity_used + skill_data['complexity']
-
-                # Verificar restrições
-                if new_time <= max_time and new_complexity <= max_complexity:
-                    path.append(neighbor)
-                    find_feasible_paths(neighbor, path, visited, new_time, new_complexity, all_paths)
-                    path.pop()  # Backtrack
-
-        visited.remove(current)
-
-    # Encontrar todos os caminhos para S6 partindo de habilidades sem pré-requisitos
-    all_paths_to_target = []
-
-    # Pontos de partida: habilidades sem pré-requisitos
-    starting_points = [skill_id for skill_id in graph.skills if not graph.skills[skill_id]['pre_reqs']]
+    import numpy as np
+    # Programação Dinâmica sobre a ordem topológica: apenas os top_k caminhos
+    # de maior valor determinístico são reconstruídos, sem enumerar todos.
+    if workers is None:
+        candidates = constrained_best_paths(graph, target_skill, max_time, max_complexity, top_k=top_k)
+    else:
+        candidates = parallel_best_paths(graph, target_skill, max_time, max_complexity, top_k, workers)
+    if not candidates:
+        return None
 
-    for start in starting_points:
-        visited = set()
-        path = [start]
-        skill_data = graph.get_skill_data(start)
-        time_used = skill_data['time']
-        complexity_used = skill_data['complexity']
+    # Executar Monte Carlo em lote: uma única matriz de perturbações para todos os caminhos
+    compiled = as_compiled(graph)
+    incidence = np.zeros((len(candidates), len(compiled)))
+    for row, (path, _, _, _) in enumerate(candidates):
+        incidence[row, [compiled.index[skill_id] for skill_id in path]] = 1.0
 
-        if start != target_skill:
-            find_feasible_paths(start, path, visited, time_used, complexity_used, all_paths_to_target)
-        else:
-            all_paths_to_target.append(path)
+    if adaptive:
+        simulation = adaptive_monte_carlo(compiled.value, incidence, rng, sampler=sampler,
+                                          target_relative_se=target_relative_se)
+        expected_values, std_devs = simulation['mean'], simulation['std']
+        monte_carlo = {
+            'adaptive': True,
+            'sampler': sampler,
+            'total_draws': simulation['total_draws'],
+            'scenarios_per_path': simulation['scenarios'].tolist(),
+            'std_errors': simulation['std_error'].tolist(),
+            'eliminated_paths': int(simulation['eliminated'].sum()),
+        }
+    else:
+        expected_values, std_devs = monte_carlo_batch(compiled.value, incidence, num_scenarios, rng)
+        monte_carlo = {
+            'adaptive': False,
+            'sampler': 'uniform',
+            'total_draws': num_scenarios * len(candidates),
+            'scenarios_per_path': [num_scenarios] * len(candidates),
+        }
 
-    # Calcular valores para cada caminho (solução determinística)
     path_values = []
-    for path in all_paths_to_target:
-        if target_skill in path:
-            total_value = sum(graph.skills[skill_id]['value'] for skill_id in path)
-            total_time = sum(graph.skills[skill_id]['time'] for skill_id in path)
-            total_complexity = sum(graph.skills[skill_id]['complexity'] for skill_id in path)
-            
-            # Executar Monte Carlo para obter valor esperado e desvio-padrão
-            expected_value, std_dev = monte_carlo_simulation(tuple(path))
-            
-            path_values.append((path, total_value, total_time, total_complexity, expected_value, std_dev))
-
-    if not path_values:
-        return None
+    for (path, total_value, total_time, total_complexity), expected_value, std_dev in zip(candidates, expected_values, std_devs):
+        path_values.append((path, total_value, total_time, total_complexity, float(expected_value), float(std_dev)))
 
     # Ordenar por valor esperado (solução estocástica)
     path_values.sort(key=lambda x: x[4], reverse=True) # x[4] é o expected_value
@@ -130,5 +439,6 @@ def desafio1_max_value_path(graph: SkillGraph, target_skill='S6', max_time=350,
             'expected_value': best_expected_value,
             'std_deviation': best_std_dev
         },
-        'all_feasible_paths': path_values
+        'top_paths': path_values,
+        'monte_carlo': monte_carlo
     }
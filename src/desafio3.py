@@ -1,28 +1,326 @@
+import math
+import bisect
 import itertools
-from decorators import performance, logger
+from decorators import performance, logger, memoize, version_key
 from grafo import SkillGraph
 
+# Limite de células (habilidades × valores) da tabela de reconstrução da DP
+# sobre o eixo de adaptabilidade; acima disso usa-se o meet-in-the-middle
+DP_MAX_CELLS = 50_000_000
+
+# Número máximo de habilidades aceito pelo meet-in-the-middle (2^(n/2) subconjuntos por metade)
+MITM_MAX_SKILLS = 40
+
+def min_time_table(values, times, max_value, take=None):
+    """
+    Vetor dp[v] = menor tempo para atingir adaptabilidade de pelo menos v (0 <= v <= max_value).
+
+    Valores acima de `max_value` são tratados como `max_value`. Se `take`
+    (array booleano habilidades × (max_value + 1)) for informado, registra
+    onde cada habilidade melhorou a tabela, para reconstrução da solução.
+    """
+    import numpy as np
+    dp = np.full(max_value + 1, np.inf)
+    dp[0] = 0
+    candidate = np.empty(max_value + 1)
+
+    for i, (value, time) in enumerate(zip(values, times)):
+        # Para v <= valor da habilidade, ela sozinha já cobre v: custo = seu tempo
+        covered = min(value, max_value)
+        candidate[:covered + 1] = time
+        candidate[covered + 1:] = dp[1:max_value + 1 - covered] + time
+        improved = candidate < dp
+        if take is not None:
+            take[i] = improved
+        np.copyto(dp, candidate, where=improved)
+    return dp
+
+def min_time_cover_dp(values, times, min_value):
+    """
+    DP exata de cobertura de custo mínimo sobre o eixo de adaptabilidade.
+
+    dp[v] é o menor tempo para atingir adaptabilidade de pelo menos v, com o
+    eixo limitado em `min_value` (valores acima do mínimo são equivalentes).
+    Cada habilidade atualiza o vetor inteiro de uma vez com NumPy (veja
+    `min_time_table`), e uma tabela booleana (habilidades × valores) registra
+    onde ela foi usada, permitindo reconstruir a solução. Complexidade O(n · min_value).
+
+    Args:
+        values (list): Adaptabilidade (inteira, não negativa) de cada habilidade.
+        times (list): Tempo de cada habilidade.
+        min_value (int): Adaptabilidade mínima.
+
+    Returns:
+        tuple: (índices escolhidos, tempo total) ou (None, None) se inviável.
+    """
+    import numpy as np
+    target = max(int(min_value), 0)
+    take = np.zeros((len(values), target + 1), dtype=bool)
+    dp = min_time_table(values, times, target, take)
+
+    if not np.isfinite(dp[target]):
+        return None, None
+
+    selected = _reconstruct_cover(take, values, target)
+    return selected, sum(times[i] for i in selected)
+
+def _reconstruct_cover(take, values, target):
+    """Percorre a tabela de escolhas de trás para frente a partir do valor alvo."""
+    selected = []
+    remaining = target
+    for i in range(len(values) - 1, -1, -1):
+        if remaining > 0 and take[i, remaining]:
+            selected.append(i)
+            remaining = max(remaining - values[i], 0)
+    selected.reverse()
+    return selected
+
+def _subset_sums(values, times):
+    """Somas de valor e tempo de todos os subconjuntos; o índice é a máscara de bits."""
+    import numpy as np
+    subset_values = np.zeros(1)
+    subset_times = np.zeros(1)
+    for value, time in zip(values, times):
+        subset_values = np.concatenate((subset_values, subset_values + value))
+        subset_times = np.concatenate((subset_times, subset_times + time))
+    return subset_values, subset_times
+
+def min_time_cover_mitm(values, times, min_value):
+    """
+    Cobertura de custo mínimo por meet-in-the-middle, para valores grandes ou não inteiros.
+
+    Enumera os 2^(n/2) subconjuntos de cada metade, ordena a segunda por
+    adaptabilidade e calcula o menor tempo de cada sufixo; para cada
+    subconjunto da primeira metade, o melhor complemento é encontrado por
+    busca binária (np.searchsorted). Complexidade O(2^(n/2) · n).
+
+    Returns:
+        tuple: (índices escolhidos, tempo total) ou (None, None) se inviável.
+    """
+    import numpy as np
+    n = len(values)
+    half = n // 2
+    left_values, left_times = _subset_sums(values[:half], times[:half])
+    right_values, right_times = _subset_sums(values[half:], times[half:])
+
+    order = np.argsort(right_values, kind='stable')
+    sorted_values = right_values[order]
+    # Menor tempo entre os subconjuntos com adaptabilidade >= sorted_values[k]
+    suffix_times = np.minimum.accumulate(right_times[order][::-1])[::-1]
+
+    positions = np.searchsorted(sorted_values, min_value - left_values, side='left')
+    feasible = positions < len(sorted_values)
+    if not feasible.any():
+        return None, None
+
+    totals = np.full(len(left_values), np.inf)
+    totals[feasible] = left_times[feasible] + suffix_times[positions[feasible]]
+    left_mask = int(np.argmin(totals))
+    position = positions[left_mask]
+    right_mask = int(order[position + np.argmin(right_times[order[position:]])])
+
+    selected = [j for j in range(half) if left_mask >> j & 1]
+    selected += [half + j for j in range(n - half) if right_mask >> j & 1]
+    return selected, sum(times[j] for j in selected)
+
+def min_time_cover(values, times, min_value):
+    """
+    Menor tempo total para atingir a adaptabilidade mínima (cobertura 0/1 exata).
+
+    Usa a DP sobre o eixo de adaptabilidade quando os valores são inteiros e a
+    tabela cabe em DP_MAX_CELLS; caso contrário, meet-in-the-middle.
+
+    Returns:
+        tuple: (índices escolhidos, tempo total, método) — índices None se inviável.
+
+    Raises:
+        ValueError: Se nenhum dos métodos for aplicável ao tamanho da instância.
+    """
+    integral = all(float(v).is_integer() and v >= 0 for v in values) and float(min_value).is_integer()
+    if integral and len(values) * (max(int(min_value), 0) + 1) <= DP_MAX_CELLS:
+        selected, total_time = min_time_cover_dp([int(v) for v in values], times, min_value)
+        return selected, total_time, 'dp'
+    if len(values) <= MITM_MAX_SKILLS:
+        selected, total_time = min_time_cover_mitm(values, times, min_value)
+        return selected, total_time, 'meet-in-the-middle'
+    raise ValueError(
+        f"Instância grande demais para a solução exata: {len(values)} habilidades com "
+        f"adaptabilidade mínima {min_value} (limites: {DP_MAX_CELLS} células na DP, "
+        f"{MITM_MAX_SKILLS} habilidades no meet-in-the-middle)")
+
+def _plain_number(value):
+    """Converte um escalar float para int quando não há parte fracionária."""
+    return int(value) if float(value).is_integer() else float(value)
+
+class AdaptabilityFrontier:
+    """
+    Fronteira completa tempo mínimo × adaptabilidade, calculada uma única vez.
+
+    `optimal_times[v]` é o menor tempo (ótimo) para atingir adaptabilidade v,
+    para todo v de 0 à adaptabilidade total das candidatas, vindo de uma
+    única DP sem limite no eixo de valores. A seleção gulosa é representada
+    pelas somas acumuladas de valor e tempo na ordem V/T. Assim, qualquer
+    limiar é respondido em O(1) (ótimo) ou O(log n) (guloso, via bisect).
+    """
+
+    def __init__(self, skill_ids, values, times, optimal_times, greedy_order, take=None):
+        self.skill_ids = skill_ids
+        self.values = values
+        self.times = times
+        self.optimal_times = optimal_times
+        self.greedy_order = greedy_order
+        self.greedy_values = list(itertools.accumulate((values[i] for i in greedy_order), initial=0))
+        self.greedy_times = list(itertools.accumulate((times[i] for i in greedy_order), initial=0))
+        self._take = take
+
+    @property
+    def max_adaptability(self):
+        return len(self.optimal_times) - 1
+
+    def optimal_time(self, min_adaptability):
+        """Menor tempo para atingir o limiar, ou None se inviável. O(1)."""
+        position = max(math.ceil(min_adaptability), 0)
+        if position > self.max_adaptability:
+            return None
+        return _plain_number(self.optimal_times[position])
+
+    def optimal_cover(self, min_adaptability):
+        """
+        Habilidades da solução ótima para o limiar e o método que as reconstruiu.
+
+        Returns:
+            tuple: (habilidades, método) — (None, None) se inviável.
+        """
+        position = max(math.ceil(min_adaptability), 0)
+        if position > self.max_adaptability:
+            return None, None
+        if self._take is not None:
+            selected, method = _reconstruct_cover(self._take, self.values, position), 'dp'
+        else:
+            selected, _, method = min_time_cover(self.values, self.times, position)
+        return [self.skill_ids[i] for i in selected], method
+
+    def optimal_skills(self, min_adaptability):
+        """Habilidades da solução ótima para o limiar (None se inviável)."""
+        return self.optimal_cover(min_adaptability)[0]
+
+    def greedy(self, min_adaptability):
+        """
+        Resultado da seleção gulosa para o limiar, em O(log n).
+
+        Returns:
+            tuple: (habilidades, adaptabilidade, tempo), como em `greedy_selection`.
+        """
+        count = bisect.bisect_left(self.greedy_values, min_adaptability)
+        count = min(count, len(self.greedy_order))
+        return ([self.skill_ids[i] for i in self.greedy_order[:count]],
+                self.greedy_values[count], self.greedy_times[count])
+
+    def gap(self, min_adaptability):
+        """Tempo extra do guloso em relação ao ótimo (None se o limiar for inviável)."""
+        optimal = self.optimal_time(min_adaptability)
+        if optimal is None:
+            return None
+        return self.greedy(min_adaptability)[2] - optimal
+
+    def as_array(self):
+        """
+        Array (3, max_adaptability + 1) pronto para plotar: limiar,
+        tempo ótimo e tempo guloso (NaN onde o limiar é inviável).
+        """
+        import numpy as np
+        thresholds = np.arange(self.max_adaptability + 1)
+        counts = np.searchsorted(self.greedy_values, thresholds, side='left')
+        counts = np.minimum(counts, len(self.greedy_order))
+        greedy = np.asarray(self.greedy_times, dtype=np.float64)[counts]
+        greedy[np.asarray(self.greedy_values)[counts] < thresholds] = np.nan
+        optimal = np.where(np.isfinite(self.optimal_times), self.optimal_times, np.nan)
+        return np.vstack((thresholds, optimal, greedy))
+
+@memoize(maxsize=32, key_func=version_key)
+def desafio3_adaptability_frontier(graph: SkillGraph, candidate_skills=None):
+    """
+    Calcula a fronteira tempo mínimo × adaptabilidade do Desafio 3 para todos os limiares.
+
+    O resultado fica em cache por versão do grafo (e lista de candidatas), de
+    modo que varreduras de `min_adaptability` não refazem a DP.
+
+    Args:
+        graph (SkillGraph): Instância do grafo de habilidades.
+        candidate_skills (list): Habilidades candidatas. Se None, as habilidades 'Base'.
+
+    Returns:
+        AdaptabilityFrontier: Fronteira consultável por limiar.
+
+    Raises:
+        ValueError: Se houver adaptabilidade não inteira ou negativa, ou se a
+            tabela (habilidades × adaptabilidade total) exceder DP_MAX_CELLS.
+    """
+    import numpy as np
+    if candidate_skills is None:
+        skill_ids = graph.get_skills_by_usage('Base')
+    else:
+        skill_ids = [s for s in candidate_skills if s in graph.skills]
+
+    compiled = graph.compile()
+    indices = [compiled.index[skill_id] for skill_id in skill_ids]
+    values = [compiled.value[i].item() for i in indices]
+    times = [compiled.time[i].item() for i in indices]
+    if not all(float(v).is_integer() and v >= 0 for v in values):
+        raise ValueError("A fronteira de adaptabilidade requer valores inteiros não negativos.")
+    values = [int(v) for v in values]
+
+    max_value = sum(values)
+    if len(values) * (max_value + 1) > DP_MAX_CELLS:
+        raise ValueError(
+            f"Fronteira grande demais: {len(values)} habilidades com adaptabilidade total "
+            f"{max_value} (limite de {DP_MAX_CELLS} células na DP).")
+    take = np.zeros((len(values), max_value + 1), dtype=bool)
+    optimal_times = min_time_table(values, times, max_value, take)
+
+    # Mesma ordem de `greedy_selection`: razão V/T decrescente, estável
+    greedy_order = sorted(range(len(values)), key=lambda i: values[i] / times[i], reverse=True)
+
+    return AdaptabilityFrontier(skill_ids, values, times, optimal_times, greedy_order, take)
+
 @performance
 @logger
-def desafio3_fast_pivot(graph: SkillGraph, min_adaptability=15):
+def desafio3_fast_pivot(graph: SkillGraph, min_adaptability=15, candidate_skills=None):
     """
     Implementa o Desafio 3 - Pivô Mais Rápido.
     
     Encontra o conjunto de habilidades básicas que atinge a adaptabilidade mínima
     com o menor tempo total, comparando a abordagem gulosa (razão Valor/Tempo)
-    com a solução ótima (busca exaustiva).
+    com a solução ótima (DP de cobertura de custo mínimo sobre a adaptabilidade).
 
     Requisito 2.3: Inclui a demonstração de um contraexemplo onde o guloso não é ótimo.
 
     Args:
         graph (SkillGraph): Instância do grafo de habilidades.
         min_adaptability (int): Nível mínimo de adaptabilidade a ser atingido.
+        candidate_skills (list): Habilidades candidatas. Se None, as habilidades 'Base'.
 
     Returns:
         dict: Dicionário com as soluções gulosa e ótima, e a análise do contraexemplo.
     """
     
-    basic_skills = graph.get_skills_by_usage('Base')
+    if candidate_skills is None:
+        basic_skills = graph.get_skills_by_usage('Base')
+    else:
+        basic_skills = [s for s in candidate_skills if s in graph.skills]
+
+    # Fronteira memoizada por versão do grafo: consultas com outros limiares
+    # não refazem a DP. Valores não inteiros ou grandes demais para a tabela
+    # caem na cobertura exata por chamada (DP limitada ou meet-in-the-middle).
+    try:
+        frontier = desafio3_adaptability_frontier(graph, candidate_skills)
+    except ValueError:
+        frontier = None
+
+    # Colunas de valor e tempo da visão compilada, indexadas por inteiro
+    compiled = graph.compile()
+    values = compiled.value.tolist()
+    times = compiled.time.tolist()
     
     @logger
     def greedy_selection(skills_list):
@@ -30,12 +328,15 @@ def desafio3_fast_pivot(graph: SkillGraph, min_adaptability=15):
         Abordagem gulosa: seleciona habilidades com maior razão Valor/Tempo (V/T)
         até atingir a adaptabilidade mínima.
         """
+        if frontier is not None:
+            return frontier.greedy(min_adaptability)
+
         # 1. Calcular razão V/T e ordenar em ordem decrescente
         skills_with_ratio = []
         for skill_id in skills_list:
-            data = graph.get_skill_data(skill_id)
-            ratio = data['value'] / data['time']
-            skills_with_ratio.append((ratio, skill_id, data))
+            i = compiled.index[skill_id]
+            ratio = values[i] / times[i]
+            skills_with_ratio.append((ratio, skill_id, i))
             
         skills_with_ratio.sort(key=lambda x: x[0], reverse=True)
         
@@ -44,53 +345,45 @@ def desafio3_fast_pivot(graph: SkillGraph, min_adaptability=15):
         total_adaptability = 0
         total_time = 0
         
-        for ratio, skill_id, skill_data in skills_with_ratio:
+        for ratio, skill_id, i in skills_with_ratio:
             if total_adaptability < min_adaptability:
                 selected.append(skill_id)
-                total_adaptability += skill_data['value']
-                total_time += skill_data['time']
+                total_adaptability += values[i]
+                total_time += times[i]
             else:
                 break
         
         return selected, total_adaptability, total_time
 
     @performance
-    def optimal_exhaustive_search(skills_list):
+    def optimal_cover_search(skills_list):
         """
-        Busca exaustiva para encontrar a solução ótima: 
-        menor tempo para atingir a adaptabilidade mínima.
+        Solução ótima exata: menor tempo para atingir a adaptabilidade mínima,
+        lida da fronteira (ou via DP / meet-in-the-middle sobre o eixo de adaptabilidade).
         """
-        best_solution = None
-        best_time = float('inf')
-        n = len(skills_list)
-
-        # Gerar todos os subconjuntos possíveis (2^n)
-        for i in range(1, 2**n):
-            subset = []
-            total_adapt = 0
-            total_time = 0
-
-            # Construir subconjunto baseado na máscara de bits
-            for j in range(n):
-                if i & (1 << j):
-                    skill_id = skills_list[j]
-                    subset.append(skill_id)
-                    total_adapt += graph.skills[skill_id]['value']
-                    total_time += graph.skills[skill_id]['time']
-
-            # Verificar se atinge adaptabilidade mínima com menor tempo
-            if total_adapt >= min_adaptability and total_time < best_time:
-                best_solution = subset
-                best_time = total_time
-
-        if best_solution is None:
-            return [], 0, 0
-
-        return best_solution, sum(graph.skills[s]['value'] for s in best_solution), best_time
+        if frontier is not None:
+            best_time = frontier.optimal_time(min_adaptability)
+            best_solution, method = frontier.optimal_cover(min_adaptability)
+            if best_solution is None:
+                return [], 0, 0, 'dp'
+            return best_solution, sum(values[compiled.index[s]] for s in best_solution), best_time, method
+
+        indices = [compiled.index[skill_id] for skill_id in skills_list]
+        selected, best_time, method = min_time_cover(
+            [values[i] for i in indices], [times[i] for i in indices], min_adaptability)
+
+        if selected is None:
+            return [], 0, 0, method
+
+        best_solution = [skills_list[j] for j in selected]
+        return best_solution, sum(values[indices[j]] for j in selected), best_time, method
 
     # --- Execução das abordagens ---
     greedy_solution, greedy_adapt, greedy_time = greedy_selection(basic_skills)
-    optimal_solution, optimal_adapt, optimal_time = optimal_exhaustive_search(basic_skills)
+    optimal_solution, optimal_adapt, optimal_time, optimal_method = optimal_cover_search(basic_skills)
+
+    # Diferença de tempo entre o guloso e o ótimo
+    greedy_gap = greedy_time - optimal_time if greedy_adapt >= min_adaptability else None
 
     # --- Contraexemplo Formal (Requisito 2.3) ---
     
@@ -143,7 +436,12 @@ def desafio3_fast_pivot(graph: SkillGraph, min_adaptability=15):
             'skills': optimal_solution,
             'adaptability': optimal_adapt,
             'time': optimal_time,
-            'efficiency': optimal_adapt/optimal_time if optimal_time > 0 else 0
+            'efficiency': optimal_adapt/optimal_time if optimal_time > 0 else 0,
+            'method': optimal_method
+        },
+        'greedy_gap': {
+            'time': greedy_gap,
+            'relative': greedy_gap / optimal_time if greedy_gap is not None and optimal_time > 0 else None
         },
         'counterexample': counterexample_analysis
     }
@@ -1,62 +1,387 @@
-import time
-import random
-from decorators import performance, logger
+import os
+import heapq
+import statistics
+import time as time_module
+from decorators import performance, logger, worker_logging_initializer
 from grafo import SkillGraph
+from benchmark_sort import generate_input, time_algorithm, DEFAULT_REPEATS
 
 # Tamanho da lista para o benchmark (usar um tamanho maior para resultados mais significativos)
 BENCHMARK_SIZE = 1000
 
+# Trechos com até este número de elementos são ordenados por inserção
+INSERTION_SORT_THRESHOLD = 16
+
+def _decorate(arr, key_func):
+    """Calcula a chave de cada elemento uma única vez."""
+    return [key_func(x) for x in arr]
+
+def _insertion_sort(keys, idx, lo, hi):
+    """Ordenação por inserção (estável) de keys[lo:hi], espelhando as trocas em idx."""
+    for i in range(lo + 1, hi):
+        key, index = keys[i], idx[i]
+        j = i - 1
+        while j >= lo and keys[j] > key:
+            keys[j + 1] = keys[j]
+            idx[j + 1] = idx[j]
+            j -= 1
+        keys[j + 1] = key
+        idx[j + 1] = index
+
+def _merge_sort_indices(keys):
+    """
+    Merge Sort bottom-up sobre a permutação de índices, com um único buffer.
+
+    Trechos de INSERTION_SORT_THRESHOLD elementos são ordenados por inserção e
+    depois intercalados em passadas de largura crescente, alternando entre o
+    array de trabalho e o buffer (sem fatiar listas a cada nível).
+    """
+    n = len(keys)
+    keys = list(keys)
+    perm = list(range(n))
+    for lo in range(0, n, INSERTION_SORT_THRESHOLD):
+        _insertion_sort(keys, perm, lo, min(lo + INSERTION_SORT_THRESHOLD, n))
+
+    key_buffer = [None] * n
+    perm_buffer = [0] * n
+    width = INSERTION_SORT_THRESHOLD
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                if keys[j] < keys[i]:
+                    key_buffer[k] = keys[j]
+                    perm_buffer[k] = perm[j]
+                    j += 1
+                else:
+                    key_buffer[k] = keys[i]
+                    perm_buffer[k] = perm[i]
+                    i += 1
+                k += 1
+            # Restos de uma das metades
+            key_buffer[k:k + mid - i] = keys[i:mid]
+            perm_buffer[k:k + mid - i] = perm[i:mid]
+            k += mid - i
+            key_buffer[k:k + hi - j] = keys[j:hi]
+            perm_buffer[k:k + hi - j] = perm[j:hi]
+        keys, key_buffer = key_buffer, keys
+        perm, perm_buffer = perm_buffer, perm
+        width *= 2
+    return perm
+
+def _merge_sort_indices_numpy(keys):
+    """
+    Merge Sort bottom-up vetorizado para chaves inteiras.
+
+    Em cada passada, a posição final de todo elemento é calculada de uma vez:
+    deslocamento dentro do seu trecho + quantidade de elementos do trecho
+    irmão que vêm antes dele, obtida por `np.searchsorted` sobre uma chave
+    composta (par de trechos, chave). Empates favorecem o trecho da esquerda,
+    preservando a estabilidade. Usa um único buffer de permutação.
+
+    Returns:
+        numpy.ndarray | None: Permutação estável, ou None se as chaves ou a
+            chave composta não couberem em int64 (o chamador usa a versão em Python).
+    """
+    import numpy as np
+    n = len(keys)
+    if n <= 1:
+        return np.arange(n)
+    # Faixa verificada com inteiros do Python: chaves fora de int64 não podem ser convertidas
+    low = min(keys)
+    high = max(keys)
+    if low < -2 ** 63 or high >= 2 ** 63:
+        return None
+    span = high - low + 1
+    if span * n >= 2 ** 62:
+        return None
+    keys = np.asarray(keys, dtype=np.int64)
+
+    perm = np.arange(n)
+    buffer = np.empty_like(perm)
+    positions = np.arange(n)
+    shifted = keys - low
+    width = 1
+    while width < n:
+        run = positions // width
+        pair = run // 2
+        is_right = (run & 1).astype(bool)
+        composite = pair * span + shifted[perm]
+
+        left_composite = composite[~is_right]
+        right_composite = composite[is_right]
+        pair_starts = pair * (2 * width)
+        offsets = positions - run * width
+
+        new_positions = np.empty(n, dtype=np.int64)
+        # Elementos da esquerda: contam os da direita estritamente menores
+        left_pairs = pair[~is_right]
+        before = (np.searchsorted(right_composite, left_composite, side='left')
+                  - np.searchsorted(right_composite, left_pairs * span, side='left'))
+        new_positions[~is_right] = pair_starts[~is_right] + offsets[~is_right] + before
+        # Elementos da direita: contam os da esquerda menores ou iguais
+        right_pairs = pair[is_right]
+        before = (np.searchsorted(left_composite, right_composite, side='right')
+                  - np.searchsorted(left_composite, right_pairs * span, side='left'))
+        new_positions[is_right] = pair_starts[is_right] + offsets[is_right] + before
+
+        buffer[new_positions] = perm
+        perm, buffer = buffer, perm
+        width *= 2
+    return perm
+
+def merge_sort_indices(keys):
+    """Permutação estável que ordena `keys` (vetorizada quando as chaves são inteiras)."""
+    if keys and all(type(k) is int for k in keys):
+        perm = _merge_sort_indices_numpy(keys)
+        if perm is not None:
+            return perm.tolist()
+    return _merge_sort_indices(keys)
+
 def merge_sort(arr, key_func):
-    """Implementação do Merge Sort."""
-    if len(arr) <= 1:
-        return arr
-
-    mid = len(arr) // 2
-    left = merge_sort(arr[:mid], key_func)
-    right = merge_sort(arr[mid:], key_func)
-
-    return merge(left, right, key_func)
-
-def merge(left, right, key_func):
-    """Função auxiliar para o Merge Sort."""
-    result = []
-    i = j = 0
-    while i < len(left) and j < len(right):
-        if key_func(left[i]) <= key_func(right[j]):
-            result.append(left[i])
-            i += 1
+    """
+    Implementação do Merge Sort (estável), no padrão decorate-once.
+
+    As chaves são calculadas uma única vez; a ordenação produz uma
+    permutação de índices (bottom-up, com um único buffer) e a lista
+    ordenada é montada no final.
+    """
+    keys = _decorate(arr, key_func)
+    return [arr[i] for i in merge_sort_indices(keys)]
+
+def _sift_down(keys, idx, lo, start, end):
+    """Restaura o heap de máximo em keys[lo:lo + end] a partir da posição relativa `start`."""
+    root = start
+    while True:
+        child = 2 * root + 1
+        if child >= end:
+            return
+        if child + 1 < end and keys[lo + child] < keys[lo + child + 1]:
+            child += 1
+        if keys[lo + root] < keys[lo + child]:
+            a, b = lo + root, lo + child
+            keys[a], keys[b] = keys[b], keys[a]
+            idx[a], idx[b] = idx[b], idx[a]
+            root = child
         else:
-            result.append(right[j])
-            j += 1
-    result.extend(left[i:])
-    result.extend(right[j:])
-    return result
+            return
+
+def _heap_sort(keys, idx, lo, hi):
+    """Heapsort in-place de keys[lo:hi] (fallback do introsort)."""
+    size = hi - lo
+    for start in range(size // 2 - 1, -1, -1):
+        _sift_down(keys, idx, lo, start, size)
+    for end in range(size - 1, 0, -1):
+        keys[lo], keys[lo + end] = keys[lo + end], keys[lo]
+        idx[lo], idx[lo + end] = idx[lo + end], idx[lo]
+        _sift_down(keys, idx, lo, 0, end)
+
+def introsort_indices(keys):
+    """
+    Introsort in-place sobre o array de chaves, espelhando as trocas nos índices.
+
+    Quick Sort com pivô pela mediana de três e partição de Hoare (equilibra
+    entradas com muitas chaves repetidas), processado com pilha explícita
+    (sempre empilhando o lado maior, profundidade O(log n)). Ao exceder
+    2·log2(n) níveis, o trecho passa para heapsort; trechos pequenos ficam
+    para uma passada final de ordenação por inserção.
+    """
+    keys = list(keys)
+    n = len(keys)
+    idx = list(range(n))
+    if n < 2:
+        return idx
+
+    stack = [(0, n, 2 * n.bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo > INSERTION_SORT_THRESHOLD:
+            if depth == 0:
+                _heap_sort(keys, idx, lo, hi)
+                break
+            depth -= 1
+
+            # Mediana de três: ordena keys[lo], keys[mid], keys[hi - 1]
+            mid = (lo + hi) // 2
+            last = hi - 1
+            if keys[mid] < keys[lo]:
+                keys[lo], keys[mid] = keys[mid], keys[lo]
+                idx[lo], idx[mid] = idx[mid], idx[lo]
+            if keys[last] < keys[lo]:
+                keys[lo], keys[last] = keys[last], keys[lo]
+                idx[lo], idx[last] = idx[last], idx[lo]
+            if keys[last] < keys[mid]:
+                keys[mid], keys[last] = keys[last], keys[mid]
+                idx[mid], idx[last] = idx[last], idx[mid]
+            pivot = keys[mid]
+
+            # Partição de Hoare
+            i, j = lo - 1, hi
+            while True:
+                i += 1
+                while keys[i] < pivot:
+                    i += 1
+                j -= 1
+                while pivot < keys[j]:
+                    j -= 1
+                if i >= j:
+                    break
+                keys[i], keys[j] = keys[j], keys[i]
+                idx[i], idx[j] = idx[j], idx[i]
+
+            # keys[lo:j + 1] <= pivô <= keys[j + 1:hi]; continua no lado menor
+            if j + 1 - lo < hi - j - 1:
+                stack.append((j + 1, hi, depth))
+                hi = j + 1
+            else:
+                stack.append((lo, j + 1, depth))
+                lo = j + 1
+
+    _insertion_sort(keys, idx, 0, n)
+    return idx
 
 def quick_sort(arr, key_func):
-    """Implementação do Quick Sort."""
-    if len(arr) <= 1:
-        return arr
-    
-    pivot = arr[len(arr) // 2]
-    pivot_key = key_func(pivot)
-    
-    left = [x for x in arr if key_func(x) < pivot_key]
-    middle = [x for x in arr if key_func(x) == pivot_key]
-    right = [x for x in arr if key_func(x) > pivot_key]
-    
-    return quick_sort(left, key_func) + middle + quick_sort(right, key_func)
+    """
+    Implementação do Quick Sort como introsort in-place (não estável), no
+    padrão decorate-once: chaves calculadas uma vez, ordenação sobre o array
+    de chaves e lista ordenada montada no final.
+    """
+    keys = _decorate(arr, key_func)
+    return [arr[i] for i in introsort_indices(keys)]
+
+# Tamanho mínimo de cada bloco na ordenação paralela; abaixo disso o custo
+# de criar processos supera o ganho
+PARALLEL_MIN_CHUNK = 10000
+
+# Tamanho da lista usada para medir a vazão da ordenação paralela
+PARALLEL_BENCHMARK_SIZE = 100000
+
+def _sort_chunk_task(keys_name, perm_name, dtype, n, lo, hi):
+    """Tarefa do pool: ordena keys[lo:hi] e grava a permutação (índices globais) em perm[lo:hi]."""
+    import numpy as np
+    from multiprocessing import shared_memory
+    keys_shm = shared_memory.SharedMemory(name=keys_name)
+    perm_shm = shared_memory.SharedMemory(name=perm_name)
+    try:
+        keys = np.ndarray((n,), dtype=dtype, buffer=keys_shm.buf)
+        perm = np.ndarray((n,), dtype=np.int64, buffer=perm_shm.buf)
+        order = merge_sort_indices(keys[lo:hi].tolist())
+        perm[lo:hi] = np.asarray(order, dtype=np.int64) + lo
+        del keys, perm
+    finally:
+        keys_shm.close()
+        perm_shm.close()
+    return hi - lo
+
+def parallel_sort_indices(keys, workers=None):
+    """
+    Merge Sort paralelo em múltiplos processos sobre memória compartilhada.
+
+    O array de chaves é copiado uma vez para um bloco de
+    `multiprocessing.shared_memory`; cada processo ordena um bloco contíguo
+    com `merge_sort_indices` e grava sua permutação em um segundo bloco
+    compartilhado, sem serializar os dados. Os blocos ordenados são então
+    intercalados com `heapq.merge` (k-way). Empates são resolvidos pelo índice
+    original, então a ordenação é estável.
+
+    Args:
+        keys (array-like): Chaves numéricas.
+        workers (int | None): Número de processos (None usa todos os núcleos).
+
+    Returns:
+        list: Permutação de índices que ordena as chaves.
+    """
+    import numpy as np
+    from multiprocessing import shared_memory
+    from concurrent.futures import ProcessPoolExecutor
+    keys = np.asarray(keys)
+    n = keys.size
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers, n // PARALLEL_MIN_CHUNK)
+    if chunks <= 1 or keys.dtype.kind not in 'biuf':
+        return merge_sort_indices(keys.tolist())
+
+    keys_shm = shared_memory.SharedMemory(create=True, size=keys.nbytes)
+    perm_shm = shared_memory.SharedMemory(create=True, size=n * np.dtype(np.int64).itemsize)
+    try:
+        shared_keys = np.ndarray(keys.shape, dtype=keys.dtype, buffer=keys_shm.buf)
+        shared_keys[:] = keys
+        perm = np.ndarray((n,), dtype=np.int64, buffer=perm_shm.buf)
+        bounds = np.linspace(0, n, chunks + 1).astype(int).tolist()
+
+        log_initializer, log_args = worker_logging_initializer()
+        with ProcessPoolExecutor(max_workers=chunks, initializer=log_initializer,
+                                 initargs=log_args) as executor:
+            futures = [executor.submit(_sort_chunk_task, keys_shm.name, perm_shm.name,
+                                       keys.dtype.str, n, lo, hi)
+                       for lo, hi in zip(bounds, bounds[1:])]
+            for future in futures:
+                future.result()
+
+        # Intercalação k-way dos blocos ordenados: (chave, índice) garante estabilidade
+        runs = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            run_perm = perm[lo:hi]
+            runs.append(zip(shared_keys[run_perm].tolist(), run_perm.tolist()))
+        result = [index for _, index in heapq.merge(*runs)]
+        del shared_keys, perm, run_perm
+        return result
+    finally:
+        keys_shm.close()
+        keys_shm.unlink()
+        perm_shm.close()
+        perm_shm.unlink()
+
+def parallel_sort_throughput(size=PARALLEL_BENCHMARK_SIZE, max_workers=None, repeats=3, seed=None):
+    """
+    Mede a vazão (elementos/s) de `parallel_sort_indices` de 1 a `max_workers` processos.
+
+    Returns:
+        list: Dicionários com workers, mediana (s), vazão e speedup sobre 1 processo.
+    """
+    import numpy as np
+    max_workers = max_workers or os.cpu_count() or 1
+    keys = np.array([item['complexity'] for item in generate_input('random', size, seed)])
+    results = []
+    for workers in range(1, max_workers + 1):
+        samples = []
+        for _ in range(repeats):
+            start = time_module.perf_counter_ns()
+            parallel_sort_indices(keys, workers)
+            samples.append(time_module.perf_counter_ns() - start)
+        median_s = statistics.median(samples) / 1e9
+        results.append({
+            'workers': workers,
+            'median_s': median_s,
+            'items_per_second': size / median_s if median_s > 0 else float('inf'),
+            'speedup': results[0]['median_s'] / median_s if results and median_s > 0 else 1.0
+        })
+    return results
 
 @performance
 @logger
-def desafio4_parallel_tracks(graph: SkillGraph):
+def desafio4_parallel_tracks(graph: SkillGraph, repeats=DEFAULT_REPEATS, seed=None,
+                             parallel_size=0, max_workers=None):
     """
     Implementa o Desafio 4 - Trilhas Paralelas.
     
     Ordena as habilidades por Complexidade (C) usando Merge Sort e Quick Sort.
     Requisito 2.4: Compara os tempos medidos com o `sorted()` nativo do Python.
+    Cada algoritmo é medido com aquecimentos e `repeats` repetições
+    (`benchmark_sort`); o tempo reportado é a mediana. Para a varredura
+    completa de tamanhos e distribuições, execute `python benchmark_sort.py`.
 
     Args:
         graph (SkillGraph): Instância do grafo de habilidades.
+        repeats (int): Número de execuções medidas por algoritmo.
+        seed (int | None): Semente da lista aleatória do benchmark.
+        parallel_size (int): Tamanho da lista na medição de vazão da ordenação
+            paralela por número de processos. 0 (padrão) desativa a medição,
+            que cria um pool por número de processos; para a varredura use
+            `python benchmark_sort.py --parallel-size N`.
+        max_workers (int | None): Maior número de processos medido (None = núcleos).
 
     Returns:
         dict: Dicionário com os resultados de performance e a análise.
@@ -69,32 +394,33 @@ def desafio4_parallel_tracks(graph: SkillGraph):
     
     # --- Benchmark de Performance (Requisito 2.4) ---
     
-    # Criar uma lista de habilidades maior para um benchmark significativo
-    # Usaremos uma lista de dicionários para simular dados mais complexos
-    benchmark_list = []
-    for i in range(BENCHMARK_SIZE):
-        skill_id = f"S_{i}"
-        complexity = random.randint(1, 100)
-        benchmark_list.append({'id': skill_id, 'complexity': complexity})
+    # Lista de dicionários para simular dados mais complexos, medida com
+    # aquecimentos e repetições; o tempo reportado é a mediana
+    benchmark_list = generate_input('random', BENCHMARK_SIZE, seed)
         
     # Função chave para o benchmark
     benchmark_key_func = lambda item: item['complexity']
+    algorithms = {
+        'merge_sort': lambda items: merge_sort(items, benchmark_key_func),
+        'quick_sort': lambda items: quick_sort(items, benchmark_key_func),
+        'native_sort': lambda items: sorted(items, key=benchmark_key_func)
+    }
+    stats = {name: time_algorithm(sort_func, benchmark_list, repeats=repeats)
+             for name, sort_func in algorithms.items()}
+    t_merge, t_quick, t_native = (stats[name]['median_ns'] / 1e9 for name in algorithms)
+
+    # Verificação de correção (fora da medição)
+    merge_sorted = algorithms['merge_sort'](benchmark_list)
+    quick_sorted = algorithms['quick_sort'](benchmark_list)
+    native_sorted = algorithms['native_sort'](benchmark_list)
+    # O Quick Sort (introsort) não é estável: a correção compara as sequências de chaves
+    keys_of = lambda items: [benchmark_key_func(item) for item in items]
+    native_keys = keys_of(native_sorted)
     
-    # 1. Merge Sort
-    start_time = time.time()
-    merge_sorted = merge_sort(benchmark_list, benchmark_key_func)
-    t_merge = time.time() - start_time
-    
-    # 2. Quick Sort
-    start_time = time.time()
-    quick_sorted = quick_sort(benchmark_list, benchmark_key_func)
-    t_quick = time.time() - start_time
-    
-    # 3. Native Sort (Requisito 2.4)
-    start_time = time.time()
-    native_sorted = sorted(benchmark_list, key=benchmark_key_func)
-    t_native = time.time() - start_time
-    
+    # Vazão da ordenação paralela (memória compartilhada) por número de processos
+    parallel_results = (parallel_sort_throughput(parallel_size, max_workers, seed=seed)
+                        if parallel_size else [])
+
     # --- Análise e Resultados ---
     
     # Ordenar as habilidades originais (12) para exibição
@@ -113,25 +439,27 @@ def desafio4_parallel_tracks(graph: SkillGraph):
     algorithm_choice = {
         'chosen': fastest_algo,
         'reason': (
-            f"O algoritmo nativo do Python (`sorted()`) foi o mais rápido ({t_native:.6f}s) "
+            f"O algoritmo nativo do Python (`sorted()`) foi o mais rápido ({t_native:.6f}s, mediana de {repeats} execuções) "
             f"para uma lista de {BENCHMARK_SIZE} elementos, devido à sua implementação otimizada "
             f"(Timsort, que é uma combinação de Merge Sort e Insertion Sort). "
             f"Entre as implementações manuais, o {fastest_algo} foi o mais rápido. "
             "A complexidade teórica O(n log n) é a mesma para Merge Sort e Quick Sort (caso médio), "
-            "mas o Quick Sort pode degradar para O(n²) no pior caso, enquanto o Merge Sort é estável em O(n log n)."
+            "e o Quick Sort implementado como introsort troca para heapsort ao exceder 2·log2(n) níveis, "
+            "evitando a degradação para O(n²); o Merge Sort é estável e também O(n log n) no pior caso."
         ),
         'complexities': {
             'merge_sort': {'best': 'O(n log n)', 'average': 'O(n log n)', 'worst': 'O(n log n)'},
-            'quick_sort': {'best': 'O(n log n)', 'average': 'O(n log n)', 'worst': 'O(n²)'},
+            'quick_sort': {'best': 'O(n log n)', 'average': 'O(n log n)', 'worst': 'O(n log n)'},  # introsort
             'native_sort': {'best': 'O(n)', 'average': 'O(n log n)', 'worst': 'O(n log n)'} # Timsort
         }
     }
 
     return {
         'sorted_skills': final_sorted_skills,
-        'merge_sort': {'time': t_merge, 'correct': merge_sorted == native_sorted},
-        'quick_sort': {'time': t_quick, 'correct': quick_sorted == native_sorted},
-        'native_sort': {'time': t_native, 'correct': True},
+        'merge_sort': {'time': t_merge, 'correct': keys_of(merge_sorted) == native_keys, 'stats': stats['merge_sort']},
+        'quick_sort': {'time': t_quick, 'correct': keys_of(quick_sorted) == native_keys, 'stats': stats['quick_sort']},
+        'native_sort': {'time': t_native, 'correct': True, 'stats': stats['native_sort']},
+        'parallel_sort': parallel_results,
         'algorithm_choice': algorithm_choice,
         'benchmark_size': BENCHMARK_SIZE
     }
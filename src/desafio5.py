@@ -1,15 +1,20 @@
 import math
-import itertools
-from decorators import performance, logger, memoize
-from grafo import SkillGraph
+import logging
+from collections import OrderedDict
+from decorators import performance, logger
+from grafo import SkillGraph, as_compiled
 
 @logger
 def get_market_probabilities():
     """
     Define e documenta as probabilidades e ajustes de valor de mercado.
     (Requisito 2.5: Documentar probabilidades e simulações)
+
+    Returns:
+        tuple: (distribuição dos regimes no ano 0, multiplicadores de valor por
+            regime, matriz de transição anual entre regimes como dict de dicts)
     """
-    # Probabilidades de diferentes cenários de mercado
+    # Probabilidades de diferentes cenários de mercado (regime atual)
     scenarios = {
         'ai_boom': 0.3,      # Foco em IA e machine learning
         'cloud_focus': 0.4,   # Foco em cloud computing
@@ -32,18 +37,408 @@ def get_market_probabilities():
         'balanced': {}    # Sem ajustes
     }
     
-    # Matriz de Transição (Exemplo para documentação)
-    transition_matrix = [
-        ['Período', 'Prob ML↑', 'Prob Nuvem↑', 'Prob BI↑', 'Prob Azure↓'],
-        ['Ano 1', '0.35', '0.25', '0.20', '0.10'],
-        ['Ano 2', '0.40', '0.30', '0.15', '0.05']
-    ]
+    # Matriz de transição anual entre regimes (linha: regime atual, coluna:
+    # regime do ano seguinte). Não é estacionária para a distribuição atual:
+    # o mercado migra gradualmente para IA, e a probabilidade do regime
+    # 'ai_boom' sobe de 0.30 no ano 1 para 0.55 no ano 5
+    regime_transitions = {
+        'ai_boom': {'ai_boom': 0.85, 'cloud_focus': 0.05, 'balanced': 0.10},
+        'cloud_focus': {'ai_boom': 0.20, 'cloud_focus': 0.70, 'balanced': 0.10},
+        'balanced': {'ai_boom': 0.25, 'cloud_focus': 0.15, 'balanced': 0.60}
+    }
+
+    return scenarios, value_adjustments, regime_transitions
+
+# Horas de estudo por ano (10 h/semana × 52 semanas)
+HOURS_PER_YEAR = 52 * 10
+
+# Probabilidade de o regime de mercado se manter de um ano para o seguinte;
+# o restante migra segundo as probabilidades dos cenários, que assim formam a
+# distribuição estacionária da cadeia
+MARKET_PERSISTENCE = 0.8
+
+class MarketModel:
+    """
+    Cadeia de Markov de regimes de mercado ao longo dos anos do horizonte.
+
+    Os regimes evoluem por uma matriz de transição numérica P (linhas somam 1)
+    a partir da distribuição inicial π0, e cada regime multiplica o valor das
+    habilidades por uma linha da matriz densa M (regimes × habilidades).
+
+    O multiplicador esperado é obtido por indução retroativa em lote:
+    G_0 = M e G_{y+1} = P · G_y, de modo que G_y[r, i] é o multiplicador
+    esperado da habilidade i daqui a y anos partindo do regime r. Cada passo é
+    um único produto matricial (R × R por R × n), e o valor esperado para
+    qualquer distribuição inicial, ou lote delas, é uma contração sobre os
+    regimes; um horizonte de 10 anos com uma dúzia de regimes custa
+    microssegundos.
+    """
+
+    def __init__(self, regimes, initial, transition, multipliers, skill_ids):
+        """
+        Args:
+            regimes (list): Nomes dos regimes (R).
+            initial (array): Distribuição dos regimes no ano 0, forma (R,).
+            transition (array): Matriz de transição anual, forma (R, R).
+            multipliers (array): Multiplicadores de valor, forma (R, n).
+            skill_ids (list): IDs das habilidades das colunas de `multipliers` (n).
+        """
+        import numpy as np
+        self.regimes = list(regimes)
+        self.skill_ids = list(skill_ids)
+        self.initial = np.asarray(initial, dtype=float)
+        self.transition = np.asarray(transition, dtype=float)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+
+        num_regimes = len(self.regimes)
+        if self.initial.shape != (num_regimes,):
+            raise ValueError(f"Distribuição inicial deve ter forma ({num_regimes},), "
+                             f"recebido {self.initial.shape}")
+        if self.transition.shape != (num_regimes, num_regimes):
+            raise ValueError(f"Matriz de transição deve ter forma ({num_regimes}, {num_regimes}), "
+                             f"recebido {self.transition.shape}")
+        if self.multipliers.shape != (num_regimes, len(self.skill_ids)):
+            raise ValueError(f"Multiplicadores devem ter forma ({num_regimes}, {len(self.skill_ids)}), "
+                             f"recebido {self.multipliers.shape}")
+        if (self.transition < 0).any() or not np.allclose(self.transition.sum(axis=1), 1.0):
+            raise ValueError("Cada linha da matriz de transição deve ser uma distribuição de probabilidade")
+
+        # G_y empilhados (anos × regimes × habilidades), estendidos sob demanda
+        self._conditional = self.multipliers[np.newaxis]
+
+    @classmethod
+    def from_scenarios(cls, skill_ids, scenarios, value_adjustments, transition=None,
+                       persistence=MARKET_PERSISTENCE):
+        """
+        Constrói o modelo a partir dos cenários de `get_market_probabilities`.
+
+        Sem matriz explícita, cada regime persiste com probabilidade
+        `persistence` e, caso contrário, sorteia o regime seguinte segundo as
+        probabilidades dos cenários. Essas probabilidades são então
+        estacionárias, e o valor esperado de cada habilidade é o mesmo em
+        todos os anos.
+        """
+        import numpy as np
+        regimes = list(scenarios)
+        initial = np.array([scenarios[regime] for regime in regimes], dtype=float)
+        multipliers = [[value_adjustments.get(regime, {}).get(skill_id, 1.0) for skill_id in skill_ids]
+                       for regime in regimes]
+        if transition is None:
+            transition = (persistence * np.eye(len(regimes))
+                          + (1 - persistence) * (initial / initial.sum())[np.newaxis, :])
+        return cls(regimes, initial, transition, multipliers, skill_ids)
+
+    @classmethod
+    def default(cls, skill_ids):
+        """
+        Modelo com os cenários, ajustes e a matriz de transição documentados em
+        `get_market_probabilities` (não estacionário: o valor esperado das
+        habilidades de IA cresce ao longo dos anos).
+        """
+        scenarios, value_adjustments, regime_transitions = get_market_probabilities()
+        transition = [[regime_transitions[regime][following] for following in scenarios]
+                      for regime in scenarios]
+        return cls.from_scenarios(skill_ids, scenarios, value_adjustments, transition)
+
+    def aligned(self, skill_ids):
+        """Mesmo modelo com as colunas na ordem de `skill_ids` (ausentes valem 1.0)."""
+        import numpy as np
+        skill_ids = list(skill_ids)
+        if skill_ids == self.skill_ids:
+            return self
+        column = {skill_id: j for j, skill_id in enumerate(self.skill_ids)}
+        multipliers = np.ones((len(self.regimes), len(skill_ids)))
+        for i, skill_id in enumerate(skill_ids):
+            if skill_id in column:
+                multipliers[:, i] = self.multipliers[:, column[skill_id]]
+        return MarketModel(self.regimes, self.initial, self.transition, multipliers, skill_ids)
+
+    @property
+    def fingerprint(self):
+        """Resumo do conteúdo do modelo, usado como chave de cache entre processos."""
+        import hashlib
+        import numpy as np
+        digest = hashlib.sha1(repr((self.regimes, self.skill_ids)).encode())
+        for array in (self.initial, self.transition, self.multipliers):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def is_stationary(self):
+        """True se o multiplicador esperado de cada habilidade não muda com os anos."""
+        import numpy as np
+        return (np.allclose(self.initial @ self.transition, self.initial)
+                or np.allclose(self.multipliers, self.multipliers[0]))
+
+    def regime_distributions(self, years):
+        """Distribuição dos regimes em cada ano, forma (years, R)."""
+        import numpy as np
+        distributions = [self.initial]
+        for _ in range(years - 1):
+            distributions.append(distributions[-1] @ self.transition)
+        return np.stack(distributions[:years])
+
+    def conditional_multipliers(self, years):
+        """Multiplicador esperado daqui a y anos dado o regime atual, forma (years, R, n)."""
+        import numpy as np
+        conditional = self._conditional
+        if len(conditional) < years:
+            steps = [conditional[-1]]
+            for _ in range(years - len(conditional)):
+                steps.append(self.transition @ steps[-1])
+            conditional = self._conditional = np.concatenate([conditional, np.stack(steps[1:])])
+        return conditional[:years]
+
+    def expected_multipliers(self, years, initial=None):
+        """
+        Multiplicador esperado de cada habilidade em cada ano.
+
+        Args:
+            years (int): Número de anos do horizonte.
+            initial (array | None): Distribuição inicial (R,) ou lote (B, R);
+                None usa a distribuição do modelo.
+
+        Returns:
+            np.ndarray: Forma (years, n), ou (B, years, n) para um lote.
+        """
+        import numpy as np
+        initial = self.initial if initial is None else np.asarray(initial, dtype=float)
+        conditional = self.conditional_multipliers(years)
+        if initial.ndim == 1:
+            return np.einsum('r,yrn->yn', initial, conditional)
+        return np.einsum('br,yrn->byn', initial, conditional)
+
+class RecommendationSolver:
+    """
+    Programação Dinâmica sobre o espaço de estados de habilidades adquiridas.
+
+    O estado é (máscara de bits das habilidades adquiridas, horas restantes,
+    profundidade restante) e os resultados ficam em uma tabela de transposição
+    compartilhada entre chamadas, de modo que caminhos que chegam ao mesmo
+    conjunto de habilidades em ordens diferentes reutilizam o mesmo valor.
+
+    O valor de uma habilidade é realizado no ano em que sua aquisição é
+    concluída, com o multiplicador esperado daquele ano segundo o
+    `MarketModel`. As tabelas (ano × habilidade) de ganho esperado vêm de uma
+    única contração do modelo, fora da recursão.
+
+    Quando o modelo é estacionário o ganho não depende do ano, e as horas
+    restantes são agrupadas: acima do tempo total das habilidades ainda não
+    adquiridas, qualquer sobra é equivalente, então o tempo é limitado a esse
+    total antes de compor a chave. Caso contrário o ano de conclusão depende
+    das horas já gastas, e a chave guarda as horas restantes e o horizonte.
+    """
+
+    def __init__(self, graph, market=None, max_depth=3, hours_per_year=HOURS_PER_YEAR):
+        """
+        Args:
+            graph (SkillGraph | CompiledSkillGraph): Grafo de habilidades.
+            market (MarketModel | None): Modelo de mercado; None usa `MarketModel.default`.
+            max_depth (int | None): Look-ahead máximo; None usa o horizonte completo.
+            hours_per_year (int): Horas de estudo que correspondem a um ano.
+        """
+        compiled = as_compiled(graph)
+        closure = compiled.closure_index()
+        self.compiled = compiled
+        self.closure = closure
+        self.max_depth = max_depth
+        self.skill_ids = compiled.ids
+        self.times = compiled.time.tolist()
+        self.pre_req_masks = closure.pre_reqs
+        self.blocked = closure.blocked
+        self.total_time = sum(self.times)
+        self.table = {}
+
+        self.market = (MarketModel.default(self.skill_ids) if market is None
+                       else market.aligned(self.skill_ids))
+        self.hours_per_year = hours_per_year
+        self.stationary = self.market.is_stationary()
+        self.values = compiled.value.tolist()
+        # Ganho esperado por (ano de conclusão, habilidade), estendido conforme o horizonte
+        self.expected_gain = []
+        self.time_horizon = None
+        self._prepare(hours_per_year)
+
+    def _prepare(self, time_horizon):
+        """Fixa o horizonte da busca e garante ganhos esperados para todos os seus anos."""
+        import numpy as np
+        self.time_horizon = time_horizon
+        years = max(math.ceil(time_horizon / self.hours_per_year), 1)
+        if len(self.expected_gain) < years:
+            multipliers = self.market.expected_multipliers(years)
+            self.expected_gain = (multipliers * np.asarray(self.values, dtype=float)).tolist()
+
+    def _key(self, state, time_left, acquired_time, depth_left):
+        if self.stationary:
+            # Sobra de tempo além do necessário para todas as habilidades restantes é irrelevante
+            return state, min(time_left, self.total_time - acquired_time), depth_left
+        return state, time_left, depth_left, self.time_horizon
+
+    def _gain(self, i, time_left):
+        """Ganho esperado da habilidade `i` concluída quando restam `time_left` horas."""
+        if self.stationary:
+            return self.expected_gain[0][i]
+        elapsed = self.time_horizon - time_left
+        year = max(math.ceil(elapsed / self.hours_per_year) - 1, 0)
+        return self.expected_gain[min(year, len(self.expected_gain) - 1)][i]
 
-    return scenarios, value_adjustments, transition_matrix
+    def available_skills(self, state, time_left):
+        """Índices das habilidades com pré-requisitos satisfeitos que cabem no tempo restante."""
+        times = self.times
+        pre_req_masks = self.pre_req_masks
+        unavailable = state | self.blocked
+        return [i for i in range(len(times))
+                if not unavailable >> i & 1 and pre_req_masks[i] & ~state == 0
+                and times[i] <= time_left]
+
+    def _branch_value(self, state, time_left, acquired_time, depth_left, i):
+        """Valor esperado de adquirir a habilidade `i` agora e seguir de forma ótima."""
+        next_depth = None if depth_left is None else depth_left - 1
+        time_after = time_left - self.times[i]
+        future_value = self._solve(state | (1 << i), time_after,
+                                   acquired_time + self.times[i], next_depth)
+        return self._gain(i, time_after) + future_value
+
+    def _solve(self, state, time_left, acquired_time, depth_left):
+        """Retorna o melhor valor esperado a partir do estado, preenchendo a tabela."""
+        if depth_left == 0 or time_left <= 0:
+            return 0
+        key = self._key(state, time_left, acquired_time, depth_left)
+        entry = self.table.get(key)
+        if entry is not None:
+            return entry[0]
+
+        best_value = -1
+        best_skill = None
+        for i in self.available_skills(state, time_left):
+            expected_value = self._branch_value(state, time_left, acquired_time, depth_left, i)
+            if expected_value > best_value:
+                best_value = expected_value
+                best_skill = i
+
+        if best_skill is None:
+            best_value = 0
+        self.table[key] = (best_value, best_skill)
+        return best_value
+
+    def solve(self, current_skills, time_horizon):
+        """
+        Calcula o caminho de maior valor esperado a partir das habilidades atuais.
+
+        Args:
+            current_skills (iterable): IDs das habilidades já adquiridas.
+            time_horizon (int): Horas disponíveis.
+
+        Returns:
+            tuple: (valor esperado, lista de IDs recomendados em ordem)
+        """
+        return self.solve_mask(self.closure.mask_of(current_skills), time_horizon)
+
+    def solve_mask(self, state, time_horizon):
+        """Mesmo que `solve`, recebendo as habilidades atuais como máscara de bits."""
+        self._prepare(time_horizon)
+        acquired_time = self._acquired_time(state)
+        expected_value = self._solve(state, time_horizon, acquired_time, self.max_depth)
+        path = self._reconstruct(state, time_horizon, acquired_time, self.max_depth)
+        return expected_value, path
+
+    def branches(self, state, time_horizon, candidates):
+        """
+        Avalia ramos da raiz: para cada habilidade candidata, o valor esperado
+        de adquiri-la primeiro e o caminho ótimo resultante.
+
+        Returns:
+            list: Tuplas (índice, valor esperado, caminho de IDs).
+        """
+        self._prepare(time_horizon)
+        acquired_time = self._acquired_time(state)
+        depth_left = self.max_depth
+        next_depth = None if depth_left is None else depth_left - 1
+        results = []
+        for i in candidates:
+            value = self._branch_value(state, time_horizon, acquired_time, depth_left, i)
+            path = [self.skill_ids[i]] + self._reconstruct(
+                state | (1 << i), time_horizon - self.times[i],
+                acquired_time + self.times[i], next_depth)
+            results.append((i, value, path))
+        return results
+
+    def _acquired_time(self, state):
+        return sum(t for i, t in enumerate(self.times) if state >> i & 1)
+
+    def _reconstruct(self, state, time_left, acquired_time, depth_left):
+        """Reconstrói o caminho seguindo as escolhas gravadas na tabela."""
+        path = []
+        while depth_left != 0 and time_left > 0:
+            entry = self.table.get(self._key(state, time_left, acquired_time, depth_left))
+            if entry is None or entry[1] is None:
+                break
+            skill = entry[1]
+            path.append(self.skill_ids[skill])
+            state |= 1 << skill
+            time_left -= self.times[skill]
+            acquired_time += self.times[skill]
+            depth_left = None if depth_left is None else depth_left - 1
+        return path
+
+def _branches_task(state, time_horizon, candidates, max_depth, market, hours_per_year):
+    """Tarefa executada no pool: avalia um subconjunto dos ramos da raiz."""
+    from parallel import worker_graph, worker_state
+
+    # O solver (e sua tabela de transposição) é reaproveitado entre tarefas do mesmo processo
+    solvers = worker_state().setdefault('desafio5_solvers', {})
+    key = (max_depth, market.fingerprint, hours_per_year)
+    solver = solvers.get(key)
+    if solver is None:
+        solver = solvers[key] = RecommendationSolver(
+            worker_graph(), market, max_depth=max_depth, hours_per_year=hours_per_year)
+    return solver.branches(state, time_horizon, candidates)
+
+def parallel_recommendation(solver, graph, state, time_horizon, workers=0):
+    """
+    Resolve a DP do Desafio 5 dividindo os ramos da raiz (primeira habilidade
+    adquirida) entre processos.
+
+    A escolha final percorre os ramos em ordem de índice com comparação
+    estrita, exatamente como a versão sequencial, então o resultado é
+    determinístico e idêntico ao de `solver.solve_mask`.
+
+    Args:
+        solver (RecommendationSolver): Solver local (define parâmetros e candidatos).
+        graph (SkillGraph | CompiledSkillGraph): Grafo compartilhado com os processos.
+        state (int): Máscara de habilidades já adquiridas.
+        time_horizon (int): Horas disponíveis.
+        workers (int): Número de processos (0 usa todos os núcleos).
+
+    Returns:
+        tuple: (valor esperado, lista de IDs recomendados em ordem)
+    """
+    from parallel import shared_graph_pool, split_round_robin, resolve_workers
+
+    if solver.max_depth == 0 or time_horizon <= 0:
+        return 0, []
+    candidates = solver.available_skills(state, time_horizon)
+    chunks = split_round_robin(candidates, resolve_workers(workers))
+    if len(chunks) <= 1:
+        return solver.solve_mask(state, time_horizon)
+
+    with shared_graph_pool(graph, len(chunks)) as executor:
+        futures = [executor.submit(_branches_task, state, time_horizon, chunk, solver.max_depth,
+                                   solver.market, solver.hours_per_year)
+                   for chunk in chunks]
+        branches = sorted(branch for future in futures for branch in future.result())
+
+    best_value = -1
+    best_path = []
+    for _, value, path in branches:
+        if value > best_value:
+            best_value = value
+            best_path = path
+    return best_value, best_path
 
 @performance
 @logger
-def desafio5_skill_recommendation(graph: SkillGraph, current_skills=[], horizon_years=5):
+def desafio5_skill_recommendation(graph: SkillGraph, current_skills=[], horizon_years=5, max_depth=3, workers=None,
+                                  market=None):
     """
     Implementa o Desafio 5 - Recomendar Próximas Habilidades.
     
@@ -55,74 +450,26 @@ def desafio5_skill_recommendation(graph: SkillGraph, current_skills=[], horizon_
         graph (SkillGraph): Instância do grafo de habilidades.
         current_skills (list): Lista de habilidades já adquiridas.
         horizon_years (int): Horizonte de planejamento em anos.
+        max_depth (int | None): Look-ahead da DP; None considera o horizonte completo.
+        workers (int | None): Se informado, divide os ramos da raiz entre processos
+            (0 usa todos os núcleos).
+        market (MarketModel | None): Regimes de mercado; None usa `MarketModel.default`.
 
     Returns:
         dict: Dicionário com recomendações e análise.
     """
     
-    scenarios, value_adjustments, _ = get_market_probabilities()
+    # Configurar parâmetros (10 h/semana, 52 semanas/ano)
+    total_hours = horizon_years * HOURS_PER_YEAR
 
-    @memoize
-    def finite_horizon_dp(current_state_tuple, time_horizon, max_depth=3):
-        """
-        Programação Dinâmica em horizonte finito com look-ahead limitado.
-        Usa memoização para otimizar cálculos repetitivos.
-        """
-        current_state = list(current_state_tuple)
-
-        def dp(state, time_left, depth=0):
-            # Caso base: profundidade máxima atingida ou sem tempo
-            if depth >= max_depth or time_left <= 0:
-                return 0, []
-
-            # Encontrar habilidades disponíveis (pré-requisitos satisfeitos)
-            available_skills = []
-            for skill_id in graph.skills:
-                if (skill_id not in state and
-                    all(p in state for p in graph.skills[skill_id]['pre_reqs'])):
-                    skill_time = graph.skills[skill_id]['time']
-                    if skill_time <= time_left:
-                        available_skills.append(skill_id)
-
-            if not available_skills:
-                return 0, []
-
-            best_value = -1
-            best_path = []
-
-            # Avaliar cada habilidade disponível
-            for skill_id in available_skills:
-                skill_data = graph.skills[skill_id]
-                remaining_time = time_left - skill_data['time']
-
-                # Calcular valor esperado considerando todos os cenários
-                expected_value = 0
-                for scenario, prob in scenarios.items():
-                    # Aplicar ajuste de cenário se existir
-                    adjustment = value_adjustments[scenario].get(skill_id, 1.0)
-                    scenario_value = skill_data['value'] * adjustment
-
-                    # Valor futuro recursivo
-                    future_value, future_path = dp(state + [skill_id], remaining_time, depth + 1)
-                    total_value = scenario_value + future_value
-                    expected_value += prob * total_value
-
-                # Atualizar melhor solução
-                if expected_value > best_value:
-                    best_value = expected_value
-                    best_path = [skill_id] + future_path
-
-            return best_value, best_path
-
-        return dp(current_state, time_horizon)
-
-    # Configurar parâmetros
-    hours_per_week = 10
-    weeks_per_year = 52
-    total_hours = horizon_years * weeks_per_year * hours_per_week
-
-    # Executar Programação Dinâmica com memoização
-    expected_value, recommended_path = finite_horizon_dp(tuple(current_skills), total_hours)
+    # Executar Programação Dinâmica sobre máscaras de bits com tabela de transposição
+    solver = RecommendationSolver(graph, market, max_depth=max_depth)
+    if workers is None:
+        expected_value, recommended_path = solver.solve(current_skills, total_hours)
+    else:
+        state = solver.closure.mask_of(current_skills)
+        expected_value, recommended_path = parallel_recommendation(
+            solver, graph, state, total_hours, workers)
 
     # Recomendar próximas 2-3 habilidades
     next_skills = recommended_path[:3]
@@ -133,5 +480,78 @@ def desafio5_skill_recommendation(graph: SkillGraph, current_skills=[], horizon_
         'total_hours': total_hours,
         'recommended_next_skills': next_skills,
         'full_recommended_path': recommended_path,
-        'expected_value': expected_value
+        'expected_value': expected_value,
+        'market_regimes': solver.market.regimes,
+        'regime_distribution': solver.market.regime_distributions(max(horizon_years, 1)).round(6).tolist()
     }
+
+# Número de perfis distintos cujas recomendações ficam em cache durante um lote
+BATCH_PROFILE_CACHE_SIZE = 10000
+
+# Limite de entradas da tabela de transposição compartilhada em um lote;
+# ao ser excedido a tabela é esvaziada, mantendo a memória constante
+BATCH_MAX_TABLE_SIZE = 1000000
+
+@logger
+def desafio5_batch_recommendations(graph, profiles, horizon_years=5, max_depth=3,
+                                   cache_size=BATCH_PROFILE_CACHE_SIZE,
+                                   max_table_size=BATCH_MAX_TABLE_SIZE, market=None):
+    """
+    Recomendações do Desafio 5 para um lote de perfis (gerador).
+
+    Os cenários de mercado, a visão compilada e a tabela de transposição da
+    DP são montados uma única vez e compartilhados por todo o lote. Perfis
+    com o mesmo conjunto de habilidades são resolvidos uma só vez (cache LRU
+    limitado por máscara de bits), e os resultados são produzidos um a um,
+    na ordem de entrada, para que a memória não cresça com o tamanho do lote.
+
+    Args:
+        graph (SkillGraph | CompiledSkillGraph): Grafo de habilidades.
+        profiles (iterable): Listas de habilidades já adquiridas, uma por perfil.
+        horizon_years (int): Horizonte de planejamento em anos.
+        max_depth (int | None): Look-ahead da DP; None considera o horizonte completo.
+        cache_size (int): Número máximo de perfis distintos mantidos em cache.
+        max_table_size (int): Número máximo de estados na tabela de transposição.
+        market (MarketModel | None): Regimes de mercado; None usa `MarketModel.default`.
+
+    Yields:
+        dict: Mesmo formato de `desafio5_skill_recommendation`, um por perfil.
+    """
+    total_hours = horizon_years * HOURS_PER_YEAR
+
+    solver = RecommendationSolver(graph, market, max_depth=max_depth)
+    regime_distribution = solver.market.regime_distributions(max(horizon_years, 1)).round(6).tolist()
+    cache = OrderedDict()
+    profiles_count = 0
+    solved = 0
+
+    for current_skills in profiles:
+        profiles_count += 1
+        current_skills = list(current_skills)
+        key = solver.closure.mask_of(current_skills)
+        entry = cache.get(key)
+        if entry is None:
+            if len(solver.table) > max_table_size:
+                solver.table.clear()
+            entry = solver.solve_mask(key, total_hours)
+            solved += 1
+            cache[key] = entry
+            if len(cache) > cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+
+        expected_value, recommended_path = entry
+        yield {
+            'current_skills': current_skills,
+            'horizon_years': horizon_years,
+            'total_hours': total_hours,
+            'recommended_next_skills': recommended_path[:3],
+            'full_recommended_path': list(recommended_path),
+            'expected_value': expected_value,
+            'market_regimes': solver.market.regimes,
+            'regime_distribution': regime_distribution
+        }
+
+    logging.info(f" LOTE DESAFIO 5: {profiles_count} perfis, {solved} conjuntos distintos resolvidos, "
+                 f"{len(solver.table)} estados na tabela")
@@ -1,6 +1,15 @@
 from collections import defaultdict
+from itertools import count
 from decorators import logger, performance
 
+# Identificadores únicos de instâncias de SkillGraph (usados nos carimbos de versão)
+_graph_ids = count()
+
+# Orçamento de reordenação do Pearce-Kelly: quando os nós revisitados desde a
+# última reconstrução passam de REORDER_WORK_FACTOR vezes o número de
+# habilidades, a ordem é reconstruída por Kahn (O(V + E)) na próxima consulta
+REORDER_WORK_FACTOR = 2
+
 class SkillGraph:
     """
     Classe principal que representa o grafo de habilidades.
@@ -9,13 +18,41 @@ class SkillGraph:
     - skills: dicionário com metadados das habilidades
     - graph: lista de adjacência para pré-requisitos (quem precisa de quem)
     - reverse_graph: grafo reverso (quem é pré-requisito de quem)
+
+    Para laços intensivos, `compile()` retorna uma visão compacta e imutável
+    (`CompiledSkillGraph`) com índices inteiros, colunas contíguas e adjacência CSR.
     """
 
-    def __init__(self):
+    def __init__(self, initialize=True):
+        """
+        Args:
+            initialize (bool): Se True, carrega as habilidades do projeto original.
+                Use False para um grafo vazio (ex.: carga via `catalog_loader`).
+        """
         self.skills = {}
         self.graph = defaultdict(list)
         self.reverse_graph = defaultdict(list)
-        self._initialize_skills()
+        # Versão incrementada a cada mutação; invalida as visões compiladas
+        self._uid = next(_graph_ids)
+        self._version = 0
+        self._compiled = None
+        # Estado da validação incremental:
+        # - _topo_rank: posição de cada habilidade em uma ordem topológica mantida
+        #   incrementalmente (algoritmo de Pearce-Kelly) a cada add_skill
+        # - _missing_pre_reqs: pré-requisito inexistente -> habilidades que o declaram
+        # - _index_stale: força reconstrução completa (ex.: após carga em massa)
+        # - _reorder_work: nós revisitados pelo Pearce-Kelly desde a última reconstrução
+        self._topo_rank = {}
+        self._next_rank = 0
+        self._first_rank = 0
+        self._has_cycle = False
+        self._missing_pre_reqs = {}
+        self._index_stale = False
+        self._reorder_work = 0
+        self._validated_version = None
+        self._validation_errors = []
+        if initialize:
+            self._initialize_skills()
 
     @logger
     def _initialize_skills(self):
@@ -42,7 +79,7 @@ class SkillGraph:
         for skill_id, name, time, value, complexity, pre_reqs, usage in skill_data:
             self.add_skill(skill_id, name, time, value, complexity, pre_reqs, usage)
 
-    @logger
+    @logger(sample_every=100)
     def add_skill(self, skill_id, name, time, value, complexity, pre_reqs, usage):
         """
         Adiciona uma habilidade ao grafo.
@@ -56,6 +93,7 @@ class SkillGraph:
             pre_reqs (list): Lista de pré-requisitos (IDs)
             usage (str): Tipo de uso (Base, Crítica, etc.)
         """
+        is_new = skill_id not in self.skills
         self.skills[skill_id] = {
             'name': name,
             'time': time,
@@ -70,6 +108,196 @@ class SkillGraph:
             self.graph[pre_req].append(skill_id)
             self.reverse_graph[skill_id].append(pre_req)
 
+        self._version += 1
+        if is_new and not self._index_stale:
+            self._register_new_skill(skill_id, pre_reqs)
+        else:
+            # Redefinir uma habilidade existente altera pré-requisitos já indexados
+            self._index_stale = True
+
+    def _register_new_skill(self, skill_id, pre_reqs):
+        """
+        Atualiza incrementalmente o índice de validação para uma habilidade nova.
+        Apenas a região da ordem topológica afetada pelas novas arestas é revisitada.
+        """
+        # A habilidade pode resolver pré-requisitos antes inexistentes
+        self._missing_pre_reqs.pop(skill_id, None)
+        for pre_req in pre_reqs:
+            if pre_req not in self.skills:
+                self._missing_pre_reqs.setdefault(pre_req, []).append(skill_id)
+
+        if self._has_cycle:
+            return
+
+        for pre_req in pre_reqs:
+            if pre_req == skill_id:
+                self._has_cycle = True
+                return
+
+        # Sem pré-requisitos já registrados, a habilidade entra antes de todas as
+        # outras e as arestas para dependentes declarados antes já respeitam a ordem
+        if not any(pre_req in self._topo_rank for pre_req in pre_reqs):
+            self._first_rank -= 1
+            self._topo_rank[skill_id] = self._first_rank
+            return
+
+        self._topo_rank[skill_id] = self._next_rank
+        self._next_rank += 1
+
+        # Arestas de entrada (pré-requisito -> nova habilidade) já respeitam a ordem;
+        # arestas de saída vêm de dependentes declarados antes
+        for dependent in self.graph.get(skill_id, []):
+            if dependent in self._topo_rank and not self._insert_edge(skill_id, dependent):
+                self._has_cycle = True
+                return
+
+        # Inserções fora de ordem em sequência (ex.: uma cadeia declarada de trás
+        # para frente) revisitam O(V) nós cada: acima do orçamento, a manutenção
+        # incremental é suspensa e o índice é reconstruído por Kahn sob demanda
+        if self._reorder_work > REORDER_WORK_FACTOR * len(self.skills):
+            self._index_stale = True
+
+    def _insert_edge(self, source, target):
+        """
+        Insere a aresta source -> target na ordem topológica dinâmica (Pearce-Kelly).
+
+        Returns:
+            bool: False se a aresta fecha um ciclo.
+        """
+        rank = self._topo_rank
+        lower, upper = rank[target], rank[source]
+        if lower > upper:
+            return True
+        if source == target:
+            return False
+
+        # Busca para frente a partir do alvo, restrita a posições < upper
+        forward, seen, stack = [], {target}, [target]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for neighbor in self.graph.get(node, []):
+                neighbor_rank = rank.get(neighbor)
+                if neighbor_rank is None:
+                    continue
+                if neighbor_rank == upper:
+                    return False
+                if neighbor not in seen and neighbor_rank < upper:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+
+        # Busca para trás a partir da origem, restrita a posições > lower
+        backward, seen, stack = [], {source}, [source]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for neighbor in self.reverse_graph.get(node, []):
+                neighbor_rank = rank.get(neighbor)
+                if neighbor_rank is not None and neighbor not in seen and neighbor_rank > lower:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+
+        self._reorder_work += len(forward) + len(backward)
+
+        # Reatribuir as posições da região afetada: ancestrais antes dos descendentes
+        backward.sort(key=rank.__getitem__)
+        forward.sort(key=rank.__getitem__)
+        ranks = sorted(rank[node] for node in backward + forward)
+        for node, new_rank in zip(backward + forward, ranks):
+            rank[node] = new_rank
+        return True
+
+    def _rebuild_validation_index(self):
+        """Reconstrói do zero o índice de validação (ordem topológica de Kahn)."""
+        self._missing_pre_reqs = {}
+        for skill_id, data in self.skills.items():
+            for pre_req in data['pre_reqs']:
+                if pre_req not in self.skills:
+                    self._missing_pre_reqs.setdefault(pre_req, []).append(skill_id)
+
+        in_degree = {skill_id: 0 for skill_id in self.skills}
+        for skill_id in self.skills:
+            for pre_req in self.reverse_graph.get(skill_id, []):
+                if pre_req in in_degree:
+                    in_degree[skill_id] += 1
+
+        order = [skill_id for skill_id, degree in in_degree.items() if degree == 0]
+        for node in order:
+            for neighbor in self.graph.get(node, []):
+                if neighbor in in_degree:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        order.append(neighbor)
+
+        self._topo_rank = {skill_id: rank for rank, skill_id in enumerate(order)}
+        self._next_rank = len(order)
+        self._first_rank = 0
+        self._has_cycle = len(order) != len(self.skills)
+        self._index_stale = False
+        self._reorder_work = 0
+
+    def add_skills_bulk(self, rows):
+        """
+        Adiciona várias habilidades de uma vez, sem logging por linha.
+
+        Usado pela carga em massa de catálogos: as listas de adjacência são
+        construídas na mesma passada e a versão do grafo é incrementada uma
+        única vez por lote.
+
+        Args:
+            rows (iterable): Tuplas (skill_id, name, time, value, complexity, pre_reqs, usage).
+
+        Returns:
+            int: Número de habilidades adicionadas.
+        """
+        skills = self.skills
+        graph = self.graph
+        reverse_graph = self.reverse_graph
+        count = 0
+        for skill_id, name, time, value, complexity, pre_reqs, usage in rows:
+            skills[skill_id] = {
+                'name': name,
+                'time': time,
+                'value': value,
+                'complexity': complexity,
+                'pre_reqs': pre_reqs,
+                'usage': usage
+            }
+            for pre_req in pre_reqs:
+                graph[pre_req].append(skill_id)
+                reverse_graph[skill_id].append(pre_req)
+            count += 1
+
+        if count:
+            self._version += 1
+            # A ordem topológica é reconstruída em uma única passada na próxima validação
+            self._index_stale = True
+        return count
+
+    def version_stamp(self):
+        """
+        Carimbo (instância, versão) que muda a cada modificação do grafo.
+        Usado como chave de cache no lugar da identidade do objeto.
+        """
+        return ('SkillGraph', self._uid, self._version)
+
+    def compile(self):
+        """
+        Retorna a visão compilada do grafo (`CompiledSkillGraph`).
+        A visão é reaproveitada enquanto o grafo não for modificado.
+        """
+        if self._compiled is None or self._compiled.version != self._version:
+            self._compiled = CompiledSkillGraph.from_graph(self)
+        return self._compiled
+
+    def closure_index(self):
+        """
+        Retorna o índice de fecho transitivo (`PrerequisiteIndex`) do grafo.
+        O índice pertence à visão compilada e é descartado junto com ela
+        quando add_skill modifica o grafo.
+        """
+        return self.compile().closure_index()
+
     def get_all_skills(self):
         """Retorna lista de todas as habilidades (IDs)."""
         return list(self.skills.keys())
@@ -82,69 +310,383 @@ class SkillGraph:
         """Retorna IDs das habilidades por tipo de uso."""
         return [skill_id for skill_id, data in self.skills.items() if data['usage'] == usage_type]
 
+    def topological_order(self):
+        """
+        Retorna as habilidades em ordem topológica (pré-requisitos antes dos dependentes),
+        a partir da ordem mantida incrementalmente. Pré-requisitos inexistentes são ignorados.
+
+        Raises:
+            ValueError: Se o grafo de pré-requisitos contiver um ciclo.
+        """
+        if self._index_stale:
+            self._rebuild_validation_index()
+        if self._has_cycle:
+            raise ValueError("Ciclo detectado no grafo de pré-requisitos.")
+        return sorted(self.skills, key=self._topo_rank.__getitem__)
+
+    def find_cycles(self):
+        """
+        Encontra todos os ciclos do grafo de pré-requisitos.
+
+        Usa o algoritmo de Tarjan (versão iterativa, sem limite de recursão) para
+        obter as componentes fortemente conexas; cada componente com mais de um
+        nó, ou com autorreferência, contém ao menos um ciclo.
+
+        Returns:
+            list: Lista de ciclos, cada um com a lista de habilidades envolvidas.
+        """
+        index_of, low_link = {}, {}
+        on_stack, scc_stack = set(), []
+        cycles = []
+        counter = 0
+
+        for root in self.skills:
+            if root in index_of:
+                continue
+            index_of[root] = low_link[root] = counter
+            counter += 1
+            scc_stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.graph.get(root, [])))]
+
+            while work:
+                node, neighbors = work[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if neighbor not in self.skills:
+                        continue
+                    if neighbor not in index_of:
+                        index_of[neighbor] = low_link[neighbor] = counter
+                        counter += 1
+                        scc_stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work.append((neighbor, iter(self.graph.get(neighbor, []))))
+                        advanced = True
+                        break
+                    if neighbor in on_stack:
+                        low_link[node] = min(low_link[node], index_of[neighbor])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[node])
+
+                if low_link[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.graph.get(node, []):
+                        component.reverse()
+                        cycles.append(component)
+
+        return cycles
+
     @performance
     @logger
     def validate_graph(self):
         """
         Verifica a integridade do grafo:
-        - Detecta ciclos usando DFS
         - Identifica pré-requisitos inexistentes
-        - Verifica nós órfãos
+        - Detecta ciclos, listando as habilidades de cada um
+
+        A validação é incremental: add_skill mantém uma ordem topológica dinâmica
+        e o registro de pré-requisitos inexistentes, de modo que a verificação
+        completa (Tarjan, iterativo) só roda quando há ciclo. O resultado é
+        reaproveitado enquanto o grafo não for modificado.
 
         Returns:
             list: Lista de erros encontrados
         """
+        if self._validated_version == self._version:
+            return list(self._validation_errors)
+
+        if self._index_stale:
+            self._rebuild_validation_index()
+
         errors = []
 
         # 1. Verificar nós com pré-requisitos inexistentes
-        for skill_id, skill_data in self.skills.items():
-            for pre_req in skill_data['pre_reqs']:
-                if pre_req not in self.skills:
-                    errors.append(f"Pré-requisito inexistente: {pre_req} -> {skill_id}")
-
-        # 2. Verificar ciclos usando DFS com detecção de back edges
-        visited = set()
-        recursion_stack = set()
-
-        def dfs_cycle_detection(node):
-            visited.add(node)
-            recursion_stack.add(node)
-
-            # Usar o reverse_graph para verificar se os pré-requisitos formam um ciclo
-            # O grafo principal (self.graph) aponta de pré-requisito para habilidade.
-            # Um ciclo ocorre se, ao seguir os pré-requisitos (reverse_graph),
-            # voltarmos a um nó na pilha de recursão.
-            for pre_req in self.reverse_graph.get(node, []):
-                if pre_req not in visited:
-                    if dfs_cycle_detection(pre_req):
-                        return True
-                elif pre_req in recursion_stack:
-                    return True # Ciclo detectado
-
-            recursion_stack.remove(node)
-            return False
+        for pre_req, dependents in self._missing_pre_reqs.items():
+            for skill_id in dependents:
+                errors.append(f"Pré-requisito inexistente: {pre_req} -> {skill_id}")
 
-        for skill_id in self.skills:
-            if skill_id not in visited:
-                if dfs_cycle_detection(skill_id):
-                    errors.append("Ciclo detectado no grafo de pré-requisitos.")
-                    break # Um ciclo é suficiente para falhar a validação
-
-        # 3. Verificar nós órfãos (não são pré-requisitos de ninguém e não têm pré-requisitos)
-        # Não é um erro crítico, mas é um aviso
-        all_pre_reqs = set(p for data in self.skills.values() for p in data['pre_reqs'])
-        
-        # Habilidades que não são pré-requisitos de ninguém
-        not_pre_req_for_anyone = set(self.skills.keys()) - all_pre_reqs
-        
-        # Habilidades que não têm pré-requisitos
-        no_pre_reqs = set(skill_id for skill_id, data in self.skills.items() if not data['pre_reqs'])
-
-        # Nós órfãos: aqueles que não são pré-requisitos de ninguém E não têm pré-requisitos
-        # Na verdade, o que importa é se eles estão conectados.
-        # Vamos focar nos erros críticos (ciclos e pré-requisitos inexistentes).
-
-        return errors
-
-# Inicializar o grafo para uso nos desafios
-graph = SkillGraph()
+        # 2. Verificar ciclos (somente se a ordem incremental detectou algum)
+        if self._has_cycle:
+            for cycle in self.find_cycles():
+                errors.append(f"Ciclo detectado no grafo de pré-requisitos: {' -> '.join(cycle)}")
+
+        self._validated_version = self._version
+        self._validation_errors = errors
+        return list(errors)
+
+class CompiledSkillGraph:
+    """
+    Visão compacta e somente leitura de um `SkillGraph`.
+
+    Estruturas:
+    - ids / index: mapeamento entre IDs textuais e índices inteiros densos
+    - time, value, complexity: colunas NumPy contíguas (int64 ou float64) indexadas pelo índice da habilidade
+    - succ_offsets / succ_targets: adjacência CSR de pré-requisito para dependente (`graph`)
+    - pred_offsets / pred_targets: adjacência CSR de dependente para pré-requisito (`reverse_graph`)
+    - has_pre_reqs: indica se a habilidade declara pré-requisitos (mesmo inexistentes)
+    - missing_pre_reqs: indica se algum pré-requisito declarado não existe no grafo
+
+    Pré-requisitos que não existem no grafo não geram arestas na visão compilada.
+    """
+
+    def __init__(self, ids, names, usages, time, value, complexity, has_pre_reqs, missing_pre_reqs,
+                 succ_offsets, succ_targets, pred_offsets, pred_targets, version=0, origin=None):
+        self.ids = list(ids)
+        self.index = {skill_id: i for i, skill_id in enumerate(self.ids)}
+        self.names = names
+        self.usages = usages
+        self.time = time
+        self.value = value
+        self.complexity = complexity
+        self.has_pre_reqs = has_pre_reqs
+        self.missing_pre_reqs = missing_pre_reqs
+        self.succ_offsets = succ_offsets
+        self.succ_targets = succ_targets
+        self.pred_offsets = pred_offsets
+        self.pred_targets = pred_targets
+        self.version = version
+        self.origin = origin
+        self._topological_order = None
+        self._closure_index = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Constrói a visão compilada a partir de um `SkillGraph`."""
+        import numpy as np
+        ids = list(graph.skills)
+        index = {skill_id: i for i, skill_id in enumerate(ids)}
+        n = len(ids)
+
+        time, value, complexity, has_pre_reqs, missing_pre_reqs = [], [], [], [], []
+        names, usages = [], []
+        sources, targets = [], []
+
+        for i, skill_id in enumerate(ids):
+            data = graph.skills[skill_id]
+            time.append(data['time'])
+            value.append(data['value'])
+            complexity.append(data['complexity'])
+            has_pre_reqs.append(bool(data['pre_reqs']))
+            missing_pre_reqs.append(any(p not in index for p in data['pre_reqs']))
+            names.append(data['name'])
+            usages.append(data['usage'])
+            for pre_req in graph.reverse_graph.get(skill_id, []):
+                if pre_req in index:
+                    sources.append(index[pre_req])
+                    targets.append(i)
+
+        # Colunas numéricas: int64 quando todos os valores são inteiros, float64 caso contrário
+        time = _numeric_column(time)
+        value = _numeric_column(value)
+        complexity = _numeric_column(complexity)
+        has_pre_reqs = np.asarray(has_pre_reqs, dtype=np.bool_)
+        missing_pre_reqs = np.asarray(missing_pre_reqs, dtype=np.bool_)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        succ_offsets, succ_targets = _build_csr(n, sources, targets)
+        pred_offsets, pred_targets = _build_csr(n, targets, sources)
+
+        return cls(ids, names, usages, time, value, complexity, has_pre_reqs, missing_pre_reqs,
+                   succ_offsets, succ_targets, pred_offsets, pred_targets, graph._version, graph._uid)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def version_stamp(self):
+        """Carimbo (origem, versão) do grafo que originou esta visão; chave de cache."""
+        return ('CompiledSkillGraph', self.origin, self.version)
+
+    def successors(self, i):
+        """Índices das habilidades que têm `i` como pré-requisito."""
+        return self.succ_targets[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def predecessors(self, i):
+        """Índices dos pré-requisitos (existentes) da habilidade `i`."""
+        return self.pred_targets[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def adjacency_lists(self):
+        """Listas Python de sucessores e predecessores, para laços puramente em Python."""
+        succ_offsets = self.succ_offsets.tolist()
+        succ_targets = self.succ_targets.tolist()
+        pred_offsets = self.pred_offsets.tolist()
+        pred_targets = self.pred_targets.tolist()
+        n = len(self.ids)
+        successors = [succ_targets[succ_offsets[i]:succ_offsets[i + 1]] for i in range(n)]
+        predecessors = [pred_targets[pred_offsets[i]:pred_offsets[i + 1]] for i in range(n)]
+        return successors, predecessors
+
+    def closure_index(self):
+        """Índice de fecho transitivo (`PrerequisiteIndex`), construído sob demanda."""
+        if self._closure_index is None:
+            self._closure_index = PrerequisiteIndex(self)
+        return self._closure_index
+
+    def topological_order(self):
+        """
+        Ordem topológica (algoritmo de Kahn) como array de índices.
+
+        Raises:
+            ValueError: Se o grafo de pré-requisitos contiver um ciclo.
+        """
+        import numpy as np
+        if self._topological_order is None:
+            n = len(self.ids)
+            in_degree = np.diff(self.pred_offsets).tolist()
+            offsets = self.succ_offsets.tolist()
+            targets = self.succ_targets.tolist()
+            order = [i for i in range(n) if in_degree[i] == 0]
+            for node in order:
+                for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        order.append(neighbor)
+            if len(order) != n:
+                raise ValueError("Ciclo detectado no grafo de pré-requisitos.")
+            self._topological_order = np.asarray(order, dtype=np.int64)
+        return self._topological_order
+
+class PrerequisiteIndex:
+    """
+    Índice de fecho transitivo dos pré-requisitos em bitsets (inteiros Python).
+
+    O bit i de cada máscara corresponde à habilidade de índice i na visão
+    compilada. Para cada habilidade são mantidas:
+    - pre_reqs: máscara dos pré-requisitos diretos
+    - ancestors: máscara de todos os pré-requisitos transitivos
+    - descendants: máscara de todas as habilidades que dependem dela
+
+    Consultas como "X pode ser desbloqueada dado o conjunto S" se reduzem a
+    poucas operações bit a bit. Habilidades com pré-requisitos inexistentes
+    nunca são desbloqueáveis. Memória no pior caso: O(n²/8) bytes.
+    """
+
+    def __init__(self, compiled):
+        import numpy as np
+        self.compiled = compiled
+        n = len(compiled)
+        successors, predecessors = compiled.adjacency_lists()
+        order = compiled.topological_order().tolist()
+
+        pre_reqs = [0] * n
+        ancestors = [0] * n
+        for node in order:
+            direct = 0
+            closure = 0
+            for pre_req in predecessors[node]:
+                direct |= 1 << pre_req
+                closure |= ancestors[pre_req]
+            pre_reqs[node] = direct
+            ancestors[node] = closure | direct
+
+        descendants = [0] * n
+        for node in reversed(order):
+            closure = 0
+            for dependent in successors[node]:
+                closure |= descendants[dependent] | (1 << dependent)
+            descendants[node] = closure
+
+        # Habilidades que declaram pré-requisitos ausentes do grafo
+        self.blocked = 0
+        for node in np.flatnonzero(compiled.missing_pre_reqs).tolist():
+            self.blocked |= 1 << node
+
+        self.pre_reqs = pre_reqs
+        self.ancestors = ancestors
+        self.descendants = descendants
+
+    def mask_of(self, skill_ids):
+        """Converte uma coleção de IDs em máscara de bits (IDs desconhecidos são ignorados)."""
+        index = self.compiled.index
+        mask = 0
+        for skill_id in skill_ids:
+            i = index.get(skill_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def ids_of(self, mask):
+        """Converte uma máscara de bits na lista de IDs, em ordem topológica."""
+        ids = self.compiled.ids
+        return [ids[i] for i in self.compiled.topological_order().tolist() if mask >> i & 1]
+
+    def is_unlockable(self, skill_id, acquired):
+        """
+        Verifica se a habilidade pode ser adquirida a partir do conjunto `acquired`
+        (IDs ou máscara): todos os pré-requisitos diretos já foram adquiridos.
+        """
+        i = self.compiled.index[skill_id]
+        acquired_mask = acquired if isinstance(acquired, int) else self.mask_of(acquired)
+        return not (self.blocked >> i & 1) and self.pre_reqs[i] & ~acquired_mask == 0
+
+    def transitive_prereqs(self, skill_id):
+        """Todos os pré-requisitos transitivos da habilidade, em ordem topológica."""
+        return self.ids_of(self.ancestors[self.compiled.index[skill_id]])
+
+    def dependents(self, skill_id):
+        """Todas as habilidades que dependem (transitivamente) da habilidade."""
+        return self.ids_of(self.descendants[self.compiled.index[skill_id]])
+
+    def minimal_unlock_set(self, skill_id, acquired=()):
+        """
+        Conjunto mínimo de habilidades a adquirir, além de `acquired`, para
+        desbloquear a habilidade (pré-requisitos transitivos ainda não adquiridos),
+        em uma ordem de aquisição válida.
+        """
+        i = self.compiled.index[skill_id]
+        if (self.ancestors[i] | 1 << i) & self.blocked:
+            raise ValueError(f"Habilidade {skill_id} depende de pré-requisitos inexistentes.")
+        acquired_mask = acquired if isinstance(acquired, int) else self.mask_of(acquired)
+        return self.ids_of(self.ancestors[i] & ~acquired_mask)
+
+def _numeric_column(data):
+    """Converte uma lista numérica em array contíguo int64 ou float64."""
+    import numpy as np
+    column = np.asarray(data)
+    if column.dtype.kind in 'biu':
+        return column.astype(np.int64)
+    return column.astype(np.float64)
+
+def _build_csr(n, sources, targets):
+    """Monta offsets/targets CSR (ordenação estável por origem) a partir de uma lista de arestas."""
+    import numpy as np
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=offsets[1:])
+    return offsets, targets[order]
+
+def as_compiled(graph):
+    """Aceita um `SkillGraph` ou `CompiledSkillGraph` e retorna a visão compilada."""
+    if isinstance(graph, CompiledSkillGraph):
+        return graph
+    return graph.compile()
+
+_default_graph = None
+
+def get_default_graph():
+    """
+    Grafo padrão dos desafios, construído no primeiro uso.
+
+    Importar este módulo não constrói nada; o grafo (e o log de cada
+    `add_skill`) só é criado quando alguém de fato precisa dele.
+    """
+    global _default_graph
+    if _default_graph is None:
+        _default_graph = SkillGraph()
+    return _default_graph
+
+def __getattr__(name):
+    # Compatibilidade: `grafo.graph` continua disponível, mas é criado sob demanda
+    if name == 'graph':
+        return get_default_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
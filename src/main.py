@@ -2,14 +2,7 @@
 Este é o script principal que orquestra a execução de todos os desafios do MOH.
 '''
 
-import os
-import time
-import math
-import matplotlib.pyplot as plt
-import numpy as np
-from tabulate import tabulate
-
-from grafo import SkillGraph
+from grafo import get_default_graph
 from decorators import get_performance_results, clear_performance_results, logger, performance
 from desafio1 import desafio1_max_value_path
 from desafio2 import desafio2_critical_skills_analysis
@@ -17,14 +10,16 @@ from desafio3 import desafio3_fast_pivot
 from desafio4 import desafio4_parallel_tracks
 from desafio5 import desafio5_skill_recommendation, get_market_probabilities
 from report_generator import generate_technical_report
+from task_runner import TaskGraph
+from result_cache import ResultCache
 
-# Inicializar o grafo
-graph = SkillGraph()
+def __getattr__(name):
+    # Compatibilidade: `main.graph` é o grafo padrão, criado apenas no primeiro acesso
+    if name == 'graph':
+        return get_default_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Importar o gerador de relatório
-from report_generator import generate_technical_report
-
-def get_visualization_data(results_d2, results_d3, results_d4):
+def get_visualization_data(results_d2, results_d3, results_d4, results_d5=None):
     """
     Coleta os dados brutos necessários para gerar gráficos e tabelas no notebook.
     Não gera arquivos, apenas retorna os dicionários de dados.
@@ -57,10 +52,21 @@ def get_visualization_data(results_d2, results_d3, results_d4):
                 ' → '.join(res['order']),
                 f"{res['cost']}h"
             ])
+        if results_d2['num_orders'] is not None:
+            mean_description = f"O custo médio das {results_d2['num_orders']} ordens válidas (respeitando pré-requisitos)"
+        else:
+            mean_description = (f"O custo médio das ordens válidas (respeitando pré-requisitos), estimado por "
+                                f"{results_d2['statistics_method']} de ordens sorteadas,")
+        best_path = ' → '.join(results_d2['best_order'])
+        if results_d2.get('orders_method', 'exata') == 'exata':
+            best_description = f"A melhor ordem ({best_path}) minimiza o tempo acumulado."
+        else:
+            best_description = (f"A melhor ordem encontrada ({best_path}) é heurística: o branch-and-bound "
+                                f"esgotou o orçamento de nós antes de provar a otimalidade.")
         viz_data['top3_table'] = {
             'headers': ['Posição', 'Ordem', 'Custo Total'],
             'data': table_data,
-            'analysis': f"**Análise:** O custo médio de todas as 120 permutações é de {results_d2['mean_cost']:.2f}h, com um desvio-padrão de {results_d2['std_dev_cost']:.2f}h. A melhor ordem ({' → '.join(results_d2['best_order'])}) minimiza o tempo acumulado."
+            'analysis': f"**Análise:** {mean_description} é de {results_d2['mean_cost']:.2f}h, com um desvio-padrão de {results_d2['std_dev_cost']:.2f}h. {best_description}"
         }
 
     # 4. Dados para a Tabela do Contraexemplo (Desafio 3)
@@ -80,20 +86,63 @@ def get_visualization_data(results_d2, results_d3, results_d4):
             'analysis': ce
         }
 
-    # 5. Dados para a Tabela de Probabilidades (Desafio 5)
-    _, _, transition_matrix = get_market_probabilities()
-    viz_data['probabilities_table'] = {
-        'headers': transition_matrix[0],
-        'data': transition_matrix[1:],
-        'description': "As probabilidades abaixo são utilizadas no algoritmo de Programação Dinâmica com look-ahead (Desafio 5) para simular a incerteza do mercado e ajustar o valor esperado das habilidades ao longo do tempo."
+    # 5. Dados para as Tabelas de Probabilidades (Desafio 5): a matriz de
+    # transição do `MarketModel` padrão e a distribuição dos regimes por ano
+    _, _, regime_transitions = get_market_probabilities()
+    regimes = list(regime_transitions)
+    viz_data['transition_table'] = {
+        'headers': ['Regime atual'] + [f"→ {regime}" for regime in regimes],
+        'data': [[regime] + [regime_transitions[regime][following] for following in regimes]
+                 for regime in regimes],
+        'description': "Matriz de transição anual entre os regimes de mercado (Cadeia de Markov) usada pela Programação Dinâmica do Desafio 5."
     }
+    if results_d5:
+        viz_data['probabilities_table'] = {
+            'headers': ['Período'] + results_d5['market_regimes'],
+            'data': [[f"Ano {year}"] + distribution
+                     for year, distribution in enumerate(results_d5['regime_distribution'], start=1)],
+            'description': "Probabilidade de cada regime de mercado em cada ano, obtida pela matriz de transição a partir da distribuição atual. A Programação Dinâmica com look-ahead (Desafio 5) pondera o valor de cada habilidade pelo multiplicador esperado do ano em que sua aquisição é concluída."
+        }
 
     return viz_data
 
 @logger
-def run_all_challenges():
-    """Executa todos os desafios e retorna os resultados e dados para visualização."""
-    
+def run_all_challenges(graph=None, parallel='thread', max_workers=None, timeout=None, cache=None, seed=None):
+    """
+    Executa todos os desafios e retorna os resultados e dados para visualização.
+
+    Os cinco desafios só leem o grafo e não dependem uns dos outros; apenas
+    os dados de visualização e o relatório precisam dos seus resultados. Eles
+    são executados concorrentemente como um grafo de tarefas (`TaskGraph`),
+    e as etapas de visualização e relatório rodam no processo chamador assim
+    que suas dependências terminam.
+
+    Args:
+        graph (SkillGraph | None): Grafo a usar; None usa `get_default_graph()`.
+        parallel (str | None): 'thread' (padrão) ou 'process' executa os
+            desafios concorrentemente; None ou 'serial' executa em série.
+            Os desafios são Python puro e limitados por CPU: sob o GIL, o modo
+            'thread' apenas intercala a execução (útil com `timeout`, cache em
+            disco e dependências prontas mais cedo), sem ganho de paralelismo
+            real; para usar vários núcleos, escolha 'process'. No modo 'process'
+            o histórico de performance registra apenas as etapas do processo
+            chamador. Os tempos do benchmark do Desafio 4 são medidos com os
+            demais desafios em andamento; para medições isoladas use 'serial'.
+        max_workers (int | None): Tamanho do pool (None: uma thread por desafio
+            no modo 'thread', o número de núcleos no modo 'process').
+        timeout (float | None): Tempo limite, em segundos, de cada desafio.
+        cache (ResultCache | bool | None): Cache em disco dos resultados dos
+            desafios; True usa `ResultCache()` com o diretório padrão. O
+            benchmark do Desafio 4 nunca é cacheado, e os desafios estocásticos
+            (1 e 2) só são cacheados quando `seed` é informada.
+        seed (int | None): Semente repassada aos desafios estocásticos (1, 2 e 4).
+
+    Raises:
+        TaskError: Se algum desafio falhar ou exceder o tempo limite.
+    """
+    if graph is None:
+        graph = get_default_graph()
+
     # Limpar resultados de performance
     clear_performance_results()
     
@@ -105,28 +154,43 @@ def run_all_challenges():
             print(f"- {error}")
         return None
     
-    # 2. Executar Desafios
-    results_d1 = desafio1_max_value_path(graph)
-    results_d2 = desafio2_critical_skills_analysis(graph)
-    results_d3 = desafio3_fast_pivot(graph)
-    results_d4 = desafio4_parallel_tracks(graph)
-    results_d5_init = desafio5_skill_recommendation(graph, current_skills=[])
+    # 2. Executar Desafios (independentes entre si)
+    if cache is True:
+        cache = ResultCache()
+    tasks = TaskGraph()
+
+    def add_challenge(name, func, cacheable=True, **params):
+        if cache and cacheable:
+            tasks.add(name, cache.call, args=(func, graph), kwargs=params, timeout=timeout)
+        else:
+            tasks.add(name, func, args=(graph,), kwargs=params, timeout=timeout)
+
+    seeds = {} if seed is None else {'rng': seed}
+    add_challenge('d1', desafio1_max_value_path, **seeds)
+    add_challenge('d2', desafio2_critical_skills_analysis, **seeds)
+    add_challenge('d3', desafio3_fast_pivot)
+    # O Desafio 4 mede tempos de execução: o resultado nunca é reaproveitado
+    add_challenge('d4', desafio4_parallel_tracks, cacheable=False, **({} if seed is None else {'seed': seed}))
+    add_challenge('d5', desafio5_skill_recommendation, current_skills=[])
     
     # 3. Coletar Dados para Visualização
-    visualization_data = get_visualization_data(results_d2, results_d3, results_d4)
+    tasks.add('viz', get_visualization_data, deps=('d2', 'd3', 'd4', 'd5'), inline=True)
     
-    # 5. Gerar Relatório Técnico (Requisito do PDF)
-    report_path = generate_technical_report(results_d1, results_d2, results_d3, results_d4, results_d5_init, visualization_data)
+    # 4. Gerar Relatório Técnico (Requisito do PDF)
+    tasks.add('report_path', generate_technical_report, deps=('d1', 'd2', 'd3', 'd4', 'd5', 'viz'), inline=True)
+
+    results = tasks.run(executor=parallel or 'serial', max_workers=max_workers)
     
-    # 4. Retornar todos os resultados para o notebook
+    # 5. Retornar todos os resultados para o notebook
     return {
-        'd1': results_d1,
-        'd2': results_d2,
-        'd3': results_d3,
-        'd4': results_d4,
-        'd5': results_d5_init,
-        'viz': visualization_data,
-        'report_path': report_path
+        'd1': results['d1'],
+        'd2': results['d2'],
+        'd3': results['d3'],
+        'd4': results['d4'],
+        'd5': results['d5'],
+        'viz': results['viz'],
+        'report_path': results['report_path'],
+        'task_timings': tasks.timings
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import os
+import sys
+import time as time_module
+import shutil
+import logging
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from decorators import init_worker_logging, worker_logging_initializer
+from grafo import SkillGraph, CompiledSkillGraph
+from snapshot import save_snapshot, load_snapshot, materialize_graph
+
+# Grafo compartilhado (somente leitura) de cada processo trabalhador,
+# carregado uma única vez pelo inicializador do pool
+_worker_graph = None
+
+# Estado auxiliar por trabalhador (ex.: tabelas de DP reaproveitadas entre tarefas)
+_worker_state = {}
+
+def _init_worker(snapshot_path, log_queue, log_level):
+    global _worker_graph
+    init_worker_logging(log_queue, log_level)
+    _worker_graph = load_snapshot(snapshot_path)
+    _worker_state.clear()
+
+def worker_graph():
+    """Visão compilada compartilhada do processo trabalhador atual."""
+    if _worker_graph is None:
+        raise RuntimeError("worker_graph() só pode ser usado dentro de um pool criado por shared_graph_pool")
+    return _worker_graph
+
+def worker_state():
+    """Dicionário de estado privado do processo trabalhador atual."""
+    return _worker_state
+
+def resolve_workers(workers):
+    """Normaliza o parâmetro `workers`: 0 ou negativo usa todos os núcleos."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+def split_round_robin(items, parts):
+    """Divide os itens em até `parts` blocos intercalados (equilibra ramos vizinhos)."""
+    parts = max(1, min(parts, len(items)))
+    return [items[i::parts] for i in range(parts)]
+
+@contextmanager
+def shared_graph_pool(graph, workers):
+    """
+    Cria um `ProcessPoolExecutor` cujos trabalhadores compartilham o grafo via snapshot.
+
+    O grafo é gravado uma única vez em um snapshot binário (ou reaproveitado,
+    se a visão compilada já veio de um snapshot) e cada trabalhador o mapeia
+    em memória no inicializador. Assim as tarefas recebem apenas índices e
+    parâmetros, nunca um `SkillGraph` serializado.
+
+    Args:
+        graph (SkillGraph | CompiledSkillGraph): Grafo a compartilhar.
+        workers (int): Número de processos.
+
+    Yields:
+        ProcessPoolExecutor: Pool pronto para receber tarefas.
+
+    Raises:
+        ValueError: Se o grafo não puder ser gravado em snapshot (grafo inválido).
+    """
+    tmp_dir = None
+    if isinstance(graph, CompiledSkillGraph) and str(graph.origin).startswith('snapshot:'):
+        snapshot_path = graph.origin[len('snapshot:'):]
+    else:
+        if isinstance(graph, CompiledSkillGraph):
+            graph = materialize_graph(graph)
+        tmp_dir = tempfile.mkdtemp(prefix='moh_pool_')
+        snapshot_path = save_snapshot(graph, os.path.join(tmp_dir, 'graph.snap'))
+
+    try:
+        _, log_args = worker_logging_initializer()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(snapshot_path, *log_args)) as executor:
+            yield executor
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def benchmark_scaling(graph, max_workers=None, repeats=3, target_skill='S6', max_time=350,
+                      max_complexity=30, horizon_years=5, max_depth=None):
+    """
+    Mede o tempo de desafio1 e desafio5 com 1 a `max_workers` processos.
+
+    Cada configuração é executada `repeats` vezes e o menor tempo é mantido.
+    O tempo inclui a criação do pool e a carga do snapshot nos trabalhadores.
+
+    Returns:
+        list: Dicionários com workers, tempos (s) e speedup em relação a 1 processo.
+    """
+    from desafio1 import desafio1_max_value_path
+    from desafio5 import desafio5_skill_recommendation
+
+    max_workers = max_workers or os.cpu_count() or 1
+    challenges = {
+        'desafio1': lambda workers: desafio1_max_value_path(
+            graph, target_skill, max_time, max_complexity, rng=42, workers=workers),
+        'desafio5': lambda workers: desafio5_skill_recommendation(
+            graph, [], horizon_years, max_depth=max_depth, workers=workers),
+    }
+
+    results = []
+    baseline = {}
+    for workers in range(1, max_workers + 1):
+        row = {'workers': workers}
+        for name, run in challenges.items():
+            best = float('inf')
+            for _ in range(repeats):
+                start = time_module.perf_counter()
+                run(workers)
+                best = min(best, time_module.perf_counter() - start)
+            baseline.setdefault(name, best)
+            row[f'{name}_s'] = best
+            row[f'{name}_speedup'] = baseline[name] / best if best > 0 else float('inf')
+        results.append(row)
+        logging.info(f" ESCALABILIDADE: {row}")
+    return results
+
+if __name__ == '__main__':
+    # Uso: python parallel.py [catálogo] [max_workers]
+    if len(sys.argv) > 1:
+        from catalog_loader import load_skill_catalog
+        graph, _ = load_skill_catalog(sys.argv[1])
+    else:
+        graph = SkillGraph()
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    print(f"{'Workers':>7} | {'D1 (s)':>9} | {'D1 speedup':>10} | {'D5 (s)':>9} | {'D5 speedup':>10}")
+    for row in benchmark_scaling(graph, max_workers):
+        print(f"{row['workers']:>7} | {row['desafio1_s']:>9.4f} | {row['desafio1_speedup']:>10.2f} | "
+              f"{row['desafio5_s']:>9.4f} | {row['desafio5_speedup']:>10.2f}")
@@ -1,5 +1,4 @@
 import os
-from tabulate import tabulate
 from decorators import logger
 
 @logger
@@ -7,6 +6,8 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
     """
     Gera o relatório técnico em formato Markdown com base nos resultados dos desafios.
     """
+    from tabulate import tabulate
+
     report_content = []
     
     report_content.append("# Relatório Técnico - Motor de Orientação de Habilidades (MOH)")
@@ -32,13 +33,13 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
         report_content.append(f"- **Desvio Padrão (σ):** `{sol['std_deviation']:.2f}`")
         report_content.append(f"- **Tempo Total:** `{sol['time']}h`")
         report_content.append(f"- **Complexidade Total:** `{sol['complexity']}`")
-        report_content.append("\n**Justificativa do Algoritmo:** O problema foi modelado como um problema de **Knapsack Multidimensional** (tempo e complexidade) resolvido por busca em grafo com poda (Programação Dinâmica implícita). A incerteza foi introduzida via **Simulação Monte Carlo** (1000 cenários) para calcular o Valor Esperado (E[V]) e o Desvio Padrão (σ).")
+        report_content.append("\n**Justificativa do Algoritmo:** O problema foi modelado como um problema de **Knapsack Multidimensional** (tempo e complexidade) resolvido por Programação Dinâmica sobre a ordem topológica do grafo, mantendo apenas rótulos (tempo, complexidade, valor) não dominados (fronteira de Pareto) em cada habilidade. A incerteza foi introduzida via **Simulação Monte Carlo** (1000 cenários) para calcular o Valor Esperado (E[V]) e o Desvio Padrão (σ).")
     else:
         report_content.append("\n*Não foi possível gerar a solução do Desafio 1.*")
         
     # Desafio 2
     report_content.append("\n### Desafio 2 — Verificação Crítica")
-    report_content.append("Foram enumeradas as 120 permutações das 5 Habilidades Críticas (S3, S5, S7, S8, S9) para calcular o custo total (Tempo de Aquisição + Espera por pré-reqs).")
+    report_content.append("As ordens de aquisição das 5 Habilidades Críticas (S3, S5, S7, S8, S9) foram avaliadas por Programação Dinâmica sobre subconjuntos, considerando apenas ordens que respeitam os pré-requisitos, para calcular o custo total (tempo acumulado).")
     
     if d2:
         report_content.append("\n#### Top 3 Melhores Ordens")
@@ -47,13 +48,13 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
         report_content.append(tabulate(table_data, headers=headers, tablefmt="pipe"))
         report_content.append(f"\n{viz_data['top3_table']['analysis']}")
         report_content.append(f"\n**Heurística Observada:** {d2['heuristic_justification']}")
-        report_content.append("\n**Análise de Complexidade:** A busca exaustiva de permutações tem complexidade **O(n!)**, onde n=5, resultando em 120 operações. Para um número maior de habilidades críticas, essa abordagem se torna inviável.")
+        report_content.append("\n**Análise de Complexidade:** A enumeração de permutações teria complexidade **O(n!)**. A DP de Held–Karp visita apenas subconjuntos fechados por pré-requisitos, em **O(2^n · n · k)** no pior caso, e fornece média e desvio-padrão exatos sem enumerar as ordens. Para conjuntos maiores, um branch-and-bound com limite pela regra de Smith encontra as melhores ordens e as estatísticas são estimadas por amostragem por importância: as ordens sorteadas passo a passo não são uniformes, e cada uma é ponderada pelo inverso da sua probabilidade de sorteio para estimar média e desvio-padrão sobre todas as ordens válidas. O branch-and-bound tem um orçamento de nós expandidos: se ele se esgota, as melhores ordens encontradas até então (a partir da regra de Smith) são reportadas como heurísticas.")
     else:
         report_content.append("\n*Não foi possível gerar a solução do Desafio 2.*")
         
     # Desafio 3
     report_content.append("\n### Desafio 3 — Pivô Mais Rápido")
-    report_content.append("O objetivo foi alcançar adaptabilidade mínima S ≥ 15 usando habilidades básicas, comparando a seleção gulosa (V/T) com a solução ótima (busca exaustiva).")
+    report_content.append("O objetivo foi alcançar adaptabilidade mínima S ≥ 15 usando habilidades básicas, comparando a seleção gulosa (V/T) com a solução ótima (DP de cobertura de custo mínimo sobre a adaptabilidade).")
     
     if d3:
         report_content.append("\n#### Comparação Guloso vs. Ótimo")
@@ -69,7 +70,7 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
         report_content.append(f"Um cenário artificial demonstra a falha do guloso. Objetivo: Adaptabilidade ≥ {ce['min_adaptability']}.")
         report_content.append(f"- **Guloso:** {ce['greedy_path']['explanation']} (Tempo: {ce['greedy_path']['time']}h)")
         report_content.append(f"- **Ótimo:** {ce['optimal_path']['explanation']} (Tempo: {ce['optimal_path']['time']}h)")
-        report_content.append("\n**Discussão:** A heurística gulosa (V/T) é aceitável quando a diferença entre o ótimo e o guloso é pequena ou quando a complexidade da busca exaustiva **O(2^n)** é proibitiva.")
+        report_content.append("\n**Discussão:** A heurística gulosa (V/T) é aceitável quando a diferença entre o ótimo e o guloso é pequena ou quando nem a DP pseudo-polinomial **O(n · S)** nem o meet-in-the-middle **O(2^(n/2) · n)** são viáveis.")
     else:
         report_content.append("\n*Não foi possível gerar a solução do Desafio 3.*")
         
@@ -86,12 +87,21 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
         report_content.append("\n#### Benchmark de Performance")
         table_data = [
             ["Merge Sort", f"{d4['merge_sort']['time']:.6f}s", "O(n log n)"],
-            ["Quick Sort", f"{d4['quick_sort']['time']:.6f}s", "O(n log n) (médio), O(n²) (pior)"],
+            ["Quick Sort", f"{d4['quick_sort']['time']:.6f}s", "O(n log n) (introsort, pior caso limitado por heapsort)"],
             ["Native Sort (Timsort)", f"{d4['native_sort']['time']:.6f}s", "O(n log n)"]
         ]
         headers = ["Algoritmo", "Tempo Medido (N=1000)", "Complexidade (Big-O)"]
         report_content.append(tabulate(table_data, headers=headers, tablefmt="pipe"))
         report_content.append(f"\n**Justificativa da Escolha:** {d4['algorithm_choice']['reason']}")
+
+        if d4.get('parallel_sort'):
+            report_content.append("\n#### Merge Sort Paralelo (memória compartilhada)")
+            table_data = [
+                [r['workers'], f"{r['median_s']:.4f}s", f"{r['items_per_second']:,.0f}", f"{r['speedup']:.2f}x"]
+                for r in d4['parallel_sort']
+            ]
+            headers = ["Processos", "Tempo (mediana)", "Elementos/s", "Speedup"]
+            report_content.append(tabulate(table_data, headers=headers, tablefmt="pipe"))
     else:
         report_content.append("\n*Não foi possível gerar a solução do Desafio 4.*")
         
@@ -106,11 +116,15 @@ def generate_technical_report(d1, d2, d3, d4, d5, viz_data):
         report_content.append(f"- **Próximas 3 Habilidades:** `{' → '.join(d5['recommended_next_skills'])}`")
         report_content.append(f"- **Valor Esperado Total:** `{d5['expected_value']:.2f}`")
         
-        report_content.append("\n#### Probabilidades de Mercado (Simulação)")
-        table_data = viz_data['probabilities_table']['data']
-        headers = viz_data['probabilities_table']['headers']
-        report_content.append(tabulate(table_data, headers=headers, tablefmt="pipe"))
-        report_content.append(f"\n**Sugestão Técnica:** Utilizou-se **Programação Dinâmica em Horizonte Finito** com um look-ahead limitado (profundidade 3) para ponderar o valor das habilidades sob diferentes cenários de mercado (AI Boom, Cloud Focus, Balanced), maximizando o Valor Esperado.")
+        report_content.append("\n#### Transições entre Regimes de Mercado")
+        report_content.append(tabulate(viz_data['transition_table']['data'],
+                                       headers=viz_data['transition_table']['headers'], tablefmt="pipe"))
+        if 'probabilities_table' in viz_data:
+            report_content.append("\n#### Probabilidades dos Regimes por Ano")
+            table_data = viz_data['probabilities_table']['data']
+            headers = viz_data['probabilities_table']['headers']
+            report_content.append(tabulate(table_data, headers=headers, tablefmt="pipe"))
+        report_content.append(f"\n**Sugestão Técnica:** Utilizou-se **Programação Dinâmica em Horizonte Finito** com um look-ahead limitado (profundidade 3) para ponderar o valor das habilidades sob diferentes cenários de mercado (AI Boom, Cloud Focus, Balanced), maximizando o Valor Esperado. Os cenários são regimes de uma **Cadeia de Markov** anual, partindo da distribuição atual e evoluindo pela matriz de transição acima; como ela não é estacionária, o regime de IA ganha probabilidade ao longo dos anos. O multiplicador esperado de cada habilidade em cada ano vem de uma indução retroativa vetorizada (NumPy) sobre essa matriz, e cada habilidade vale o multiplicador do ano em que sua aquisição é concluída.")
     else:
         report_content.append("\n*Não foi possível gerar a solução do Desafio 5.*")
         
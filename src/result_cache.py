@@ -0,0 +1,290 @@
+import os
+import json
+import zlib
+import pickle
+import hashlib
+import inspect
+import logging
+import tempfile
+from contextlib import contextmanager
+from decorators import memoize, version_key
+from grafo import as_compiled
+
+# Diretório padrão do cache (sobrescrito pela variável de ambiente MOH_CACHE_DIR)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'moh_results')
+
+# Tamanho máximo do cache em disco; acima dele as entradas menos usadas são removidas
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Nível de compressão zlib das entradas
+DEFAULT_COMPRESS_LEVEL = 6
+
+# Versão do formato das entradas; alterar invalida todo o cache
+CACHE_FORMAT_VERSION = 1
+
+ENTRY_SUFFIX = '.pkl.z'
+LOCK_FILE = '.lock'
+
+# Parâmetros de semente: chamadas com algum deles igual a None não são determinísticas
+SEED_PARAMS = ('seed', 'rng')
+
+# Diretório dos módulos do sistema, cujo código-fonte compõe a chave do cache
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@memoize(maxsize=32, key_func=version_key)
+def graph_fingerprint(graph):
+    """
+    Hash SHA-256 do conteúdo do grafo (IDs, nomes, usos, atributos numéricos
+    e arestas de pré-requisito), independente da instância ou do processo.
+
+    Memoizado pelo carimbo de versão: só é recalculado se o grafo mudar.
+    """
+    compiled = as_compiled(graph)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(compiled.ids), [str(name) for name in compiled.names],
+                              [str(usage) for usage in compiled.usages]],
+                             ensure_ascii=False).encode('utf-8'))
+    for column in (compiled.time, compiled.value, compiled.complexity, compiled.missing_pre_reqs,
+                   compiled.pred_offsets, compiled.pred_targets):
+        digest.update(str(column.dtype).encode())
+        digest.update(column.tobytes())
+    return digest.hexdigest()
+
+_source_hashes = {}
+
+def code_fingerprint(directory=SOURCE_DIR):
+    """
+    Hash do código-fonte de todos os módulos `.py` do diretório.
+
+    Um desafio chama funções de outros módulos (grafo, decoradores, etc.),
+    então qualquer alteração no código do sistema invalida o cache. O hash é
+    reaproveitado enquanto nenhum arquivo mudar de mtime ou tamanho.
+    """
+    stamps = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.name.endswith('.py') and entry.is_file():
+            stat = entry.stat()
+            stamps.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    stamps = tuple(stamps)
+    if stamps not in _source_hashes:
+        digest = hashlib.sha256()
+        for name, _, _ in stamps:
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(hashlib.sha256(f.read()).digest())
+        _source_hashes.clear()
+        _source_hashes[stamps] = digest.hexdigest()
+    return _source_hashes[stamps]
+
+def _canonical(value):
+    """
+    Converte um parâmetro em estrutura JSON estável. Grafos viram o hash do
+    seu conteúdo; tipos sem representação estável levantam TypeError.
+    """
+    if hasattr(value, 'version_stamp'):
+        return {'__graph__': graph_fingerprint(value)}
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return {'__float__': value.hex()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted((_canonical(v) for v in value), key=repr)}
+    if isinstance(value, dict):
+        return {'__dict__': sorted(([_canonical(k), _canonical(v)] for k, v in value.items()), key=repr)}
+    raise TypeError(f"Parâmetro sem representação estável para o cache: {type(value).__name__}")
+
+class ResultCache:
+    """
+    Cache em disco de resultados dos desafios, endereçado por conteúdo.
+
+    A chave é o SHA-256 da função (nome qualificado e hash do código-fonte de
+    todos os módulos do sistema), do conteúdo do grafo e de todos os
+    parâmetros já com os valores padrão aplicados, incluindo a semente.
+    Chamadas sem semente (`seed`/`rng` igual a None) e parâmetros sem
+    representação estável (ex.: um `numpy.random.Generator`) desativam o
+    cache da chamada. Benchmarks de tempo não devem passar pelo cache.
+
+    Cada entrada é um pickle comprimido com zlib, gravado em um arquivo
+    temporário no mesmo diretório e publicado com `os.replace` (atômico), de
+    modo que leitores concorrentes nunca veem arquivos parciais. Leituras
+    atualizam o mtime da entrada, e a remoção por tamanho descarta as
+    entradas de mtime mais antigo sob um lock de arquivo (`fcntl`, quando
+    disponível), seguro entre processos.
+
+    As entradas são desserializadas com pickle: use apenas diretórios confiáveis.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, compress_level=DEFAULT_COMPRESS_LEVEL):
+        """
+        Args:
+            directory (str | None): Diretório do cache; None usa MOH_CACHE_DIR ou DEFAULT_CACHE_DIR.
+            max_bytes (int): Tamanho máximo total das entradas.
+            compress_level (int): Nível de compressão zlib (0-9).
+        """
+        self.directory = directory or os.environ.get('MOH_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, func, *args, **kwargs):
+        """
+        Chave (hex SHA-256) de uma chamada `func(*args, **kwargs)`.
+
+        Raises:
+            TypeError: Se algum parâmetro não tiver representação estável.
+        """
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        payload = {
+            'format': CACHE_FORMAT_VERSION,
+            'function': f"{func.__module__}.{func.__qualname__}",
+            'source': code_fingerprint(),
+            'params': _canonical(dict(bound.arguments)),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def unseeded_params(func, *args, **kwargs):
+        """Parâmetros de semente (`SEED_PARAMS`) da chamada que ficaram como None."""
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        return [name for name in SEED_PARAMS if name in bound.arguments and bound.arguments[name] is None]
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def lookup(self, key):
+        """
+        Lê uma entrada.
+
+        Returns:
+            tuple: (encontrado, valor). Entradas corrompidas são removidas e contam como ausentes.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False, None
+        try:
+            value = pickle.loads(zlib.decompress(data))
+        except Exception as e:
+            logging.warning(f" CACHE: entrada corrompida removida ({key[:12]}): {e}")
+            self._remove(path)
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key, value):
+        """Grava uma entrada de forma atômica e aplica o limite de tamanho."""
+        os.makedirs(self.directory, exist_ok=True)
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp_', suffix=ENTRY_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def call(self, func, *args, **kwargs):
+        """Retorna `func(*args, **kwargs)` do cache, calculando e gravando em caso de ausência."""
+        unseeded = self.unseeded_params(func, *args, **kwargs)
+        if unseeded:
+            logging.info(f" CACHE: {func.__name__} executado sem cache (sem semente: {', '.join(unseeded)})")
+            return func(*args, **kwargs)
+        try:
+            key = self.key(func, *args, **kwargs)
+        except TypeError as e:
+            logging.info(f" CACHE: {func.__name__} executado sem cache ({e})")
+            return func(*args, **kwargs)
+
+        found, value = self.lookup(key)
+        if found:
+            self.hits += 1
+            logging.info(f" CACHE HIT: {func.__name__} ({key[:12]})")
+            return value
+
+        self.misses += 1
+        value = func(*args, **kwargs)
+        self.put(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(ENTRY_SUFFIX) or name.startswith('.tmp_'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Tamanho total (bytes) das entradas."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Remove as entradas de mtime mais antigo até o total caber em `max_bytes`.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        with self._lock():
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    removed += 1
+                total -= size
+        return removed
+
+    def clear(self):
+        """Remove todas as entradas."""
+        with self._lock():
+            for _, _, path in self._entries():
+                self._remove(path)
+
+    @contextmanager
+    def _lock(self):
+        # Lock exclusivo entre processos para a remoção; sem fcntl (Windows) a
+        # publicação atômica continua segura e apenas a remoção fica sem lock
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,184 @@
+import os
+import json
+import struct
+from grafo import SkillGraph, CompiledSkillGraph
+
+# Formato binário do snapshot (little-endian):
+#   magic (8 bytes) | versão do formato (uint32) | tamanho do cabeçalho (uint32)
+#   cabeçalho JSON (utf-8) | padding | arrays alinhados em ALIGNMENT bytes
+# O cabeçalho descreve dtype, shape e offset de cada array. As strings (IDs, nomes
+# e usos) ficam em tabelas de strings: um blob utf-8 + offsets int64.
+MAGIC = b'MOHSNAP\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+_NUMERIC_ARRAYS = ('time', 'value', 'complexity', 'has_pre_reqs', 'missing_pre_reqs',
+                   'succ_offsets', 'succ_targets', 'pred_offsets', 'pred_targets')
+_STRING_TABLES = ('ids', 'names', 'usages')
+
+class StringTable:
+    """
+    Sequência somente leitura de strings armazenadas em um blob utf-8 + offsets.
+    As strings são decodificadas sob demanda, sem copiar o blob mapeado.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        blob = bytes(self.blob)
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield blob[start:end].decode('utf-8')
+
+def _encode_strings(strings):
+    """Codifica uma lista de strings em (blob uint8, offsets int64)."""
+    import numpy as np
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def save_snapshot(graph, path):
+    """
+    Serializa um `SkillGraph` validado e compilado em um snapshot binário versionado.
+
+    O grafo precisa estar íntegro (sem ciclos nem pré-requisitos inexistentes),
+    pois o snapshot guarda apenas a visão compilada. A escrita é atômica:
+    o arquivo é gravado em um temporário e renomeado ao final.
+
+    Args:
+        graph (SkillGraph): Grafo a ser serializado.
+        path (str): Caminho do arquivo de destino.
+
+    Returns:
+        str: Caminho do snapshot gravado.
+
+    Raises:
+        ValueError: Se o grafo não passar na validação.
+    """
+    import numpy as np
+    errors = graph.validate_graph()
+    if errors:
+        raise ValueError(f"Grafo inválido, snapshot não gerado: {'; '.join(errors)}")
+
+    compiled = graph.compile()
+    arrays = {name: np.ascontiguousarray(getattr(compiled, name)) for name in _NUMERIC_ARRAYS}
+    for name in _STRING_TABLES:
+        blob, offsets = _encode_strings(list(getattr(compiled, name)))
+        arrays[f'{name}_blob'] = blob
+        arrays[f'{name}_offsets'] = offsets
+
+    # Primeiro passo: calcular o tamanho do cabeçalho com offsets provisórios
+    layout = {name: {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': 0}
+              for name, array in arrays.items()}
+    header = {'num_skills': len(compiled), 'graph_version': compiled.version, 'arrays': layout}
+    header_size = len(json.dumps(header).encode('utf-8')) + 32 * len(arrays)
+
+    position = _align(_PREAMBLE.size + header_size)
+    for name, array in arrays.items():
+        layout[name]['offset'] = position
+        position = _align(position + array.nbytes)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    if len(header_bytes) > header_size:
+        raise ValueError("Cabeçalho do snapshot excede o espaço reservado")
+    header_bytes = header_bytes.ljust(header_size)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_size))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(position)
+    os.replace(tmp_path, path)
+    return path
+
+def load_snapshot(path):
+    """
+    Carrega um snapshot via mapeamento de memória (zero cópia).
+
+    Os arrays numéricos e as tabelas de strings são views sobre o arquivo
+    mapeado, de modo que vários processos que carregam o mesmo snapshot
+    compartilham as páginas do cache do sistema operacional. Apenas os IDs
+    são decodificados (para o índice ID → inteiro); nomes e usos são lidos
+    sob demanda.
+
+    Args:
+        path (str): Caminho do snapshot.
+
+    Returns:
+        CompiledSkillGraph: Visão compilada somente leitura.
+
+    Raises:
+        ValueError: Se o arquivo não for um snapshot ou tiver versão incompatível.
+    """
+    import numpy as np
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    if buffer.size < _PREAMBLE.size:
+        raise ValueError(f"Arquivo de snapshot inválido: {path}")
+
+    magic, version, header_size = _PREAMBLE.unpack(bytes(buffer[:_PREAMBLE.size]))
+    if magic != MAGIC:
+        raise ValueError(f"Arquivo de snapshot inválido: {path}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão de snapshot incompatível: {version} (esperada {FORMAT_VERSION})")
+
+    header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_size]).decode('utf-8'))
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        start = spec['offset']
+        end = start + count * dtype.itemsize
+        if end > buffer.size:
+            raise ValueError(f"Snapshot truncado: array '{name}' excede o tamanho do arquivo")
+        arrays[name] = buffer[start:end].view(dtype).reshape(spec['shape'])
+
+    ids, names, usages = (StringTable(arrays[f'{name}_blob'], arrays[f'{name}_offsets'])
+                          for name in _STRING_TABLES)
+
+    return CompiledSkillGraph(
+        list(ids), names, usages,
+        arrays['time'], arrays['value'], arrays['complexity'],
+        arrays['has_pre_reqs'], arrays['missing_pre_reqs'],
+        arrays['succ_offsets'], arrays['succ_targets'],
+        arrays['pred_offsets'], arrays['pred_targets'],
+        header['graph_version'], f"snapshot:{os.path.abspath(path)}"
+    )
+
+def materialize_graph(compiled):
+    """
+    Reconstrói um `SkillGraph` mutável a partir de uma visão compilada
+    (por exemplo, carregada de um snapshot).
+    """
+    graph = SkillGraph(initialize=False)
+    ids = compiled.ids
+    times = compiled.time.tolist()
+    values = compiled.value.tolist()
+    complexities = compiled.complexity.tolist()
+    names = list(compiled.names)
+    usages = list(compiled.usages)
+    _, predecessors = compiled.adjacency_lists()
+    graph.add_skills_bulk(
+        (ids[i], names[i], times[i], values[i], complexities[i],
+         [ids[p] for p in predecessors[i]], usages[i])
+        for i in range(len(ids))
+    )
+    return graph
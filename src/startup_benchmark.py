@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import tempfile
+import statistics
+import subprocess
+import time as time_module
+
+# Módulos medidos por padrão: os pontos de entrada do sistema
+DEFAULT_MODULES = ('main', 'desafio1', 'desafio2', 'desafio3', 'desafio4', 'desafio5', 'grafo', 'decorators')
+
+DEFAULT_RUNS = 7
+
+# Orçamento de cold start (ms) da importação de cada módulo, sem contar a
+# inicialização do interpretador
+DEFAULT_BUDGET_MS = 100.0
+
+# Dependências pesadas que não podem ser carregadas só por importar os módulos
+HEAVY_MODULES = ('numpy', 'matplotlib', 'tabulate', 'scipy')
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Executado em um interpretador novo, em um diretório temporário vazio
+_PROBE = """
+import sys, time, json
+start = time.perf_counter_ns()
+import {module}
+elapsed = time.perf_counter_ns() - start
+import grafo, decorators
+print(json.dumps({{
+    'import_ns': elapsed,
+    'heavy_loaded': [name for name in {heavy!r} if name in sys.modules],
+    'graph_built': grafo._default_graph is not None,
+    'logging_configured': decorators._logging_configured,
+}}))
+"""
+
+def measure_import(module, runs=DEFAULT_RUNS):
+    """
+    Mede a importação de `module` em `runs` interpretadores novos (cold start).
+
+    Além do tempo, verifica efeitos colaterais da importação: dependências
+    pesadas carregadas, grafo padrão construído, logging configurado e
+    arquivos criados no diretório de trabalho.
+
+    Returns:
+        dict: Mediana e máximo (ms) da importação e do processo completo,
+        e os efeitos colaterais observados.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])))
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    import_ms = []
+    process_ms = []
+    probe = None
+    created_files = set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cwd:
+            start = time_module.perf_counter_ns()
+            completed = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env,
+                                       capture_output=True, text=True, check=True)
+            process_ms.append((time_module.perf_counter_ns() - start) / 1e6)
+            created_files.update(os.listdir(cwd))
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        import_ms.append(probe['import_ns'] / 1e6)
+
+    return {
+        'module': module,
+        'runs': runs,
+        'import_median_ms': statistics.median(import_ms),
+        'import_max_ms': max(import_ms),
+        'process_median_ms': statistics.median(process_ms),
+        'heavy_loaded': probe['heavy_loaded'],
+        'graph_built': probe['graph_built'],
+        'logging_configured': probe['logging_configured'],
+        'created_files': sorted(created_files),
+    }
+
+def run_startup_benchmark(modules=DEFAULT_MODULES, runs=DEFAULT_RUNS):
+    """Mede a importação de cada módulo (veja `measure_import`)."""
+    return [measure_import(module, runs) for module in modules]
+
+def check_budget(results, budget_ms=DEFAULT_BUDGET_MS):
+    """
+    Lista as violações do orçamento de cold start: mediana de importação
+    acima de `budget_ms` ou qualquer efeito colateral na importação.
+    """
+    violations = []
+    for r in results:
+        if r['import_median_ms'] > budget_ms:
+            violations.append(f"{r['module']}: importação em {r['import_median_ms']:.1f} ms "
+                              f"(orçamento {budget_ms:.1f} ms)")
+        if r['heavy_loaded']:
+            violations.append(f"{r['module']}: carrega {', '.join(r['heavy_loaded'])} na importação")
+        if r['graph_built']:
+            violations.append(f"{r['module']}: constrói o grafo padrão na importação")
+        if r['logging_configured']:
+            violations.append(f"{r['module']}: configura o logging na importação")
+        if r['created_files']:
+            violations.append(f"{r['module']}: cria arquivos na importação ({', '.join(r['created_files'])})")
+    return violations
+
+def format_results(results):
+    """Tabela de texto com os tempos de importação e de processo (ms)."""
+    lines = [f"{'Módulo':<14} {'Import (ms)':>12} {'Máx (ms)':>10} {'Processo (ms)':>14}"]
+    for r in results:
+        lines.append(f"{r['module']:<14} {r['import_median_ms']:>12.1f} {r['import_max_ms']:>10.1f} "
+                     f"{r['process_median_ms']:>14.1f}")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de cold start da importação dos módulos do MOH.")
+    parser.add_argument('--modules', nargs='+', default=list(DEFAULT_MODULES))
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmark(args.modules, args.runs)
+    print(format_results(results))
+
+    violations = check_budget(results, args.budget_ms)
+    if violations:
+        print("\nORÇAMENTO DE COLD START VIOLADO:")
+        for violation in violations:
+            print(f"  {violation}")
+        return 1
+    print(f"\nTodas as importações dentro do orçamento de {args.budget_ms:.1f} ms, sem efeitos colaterais.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import os
+import logging
+import threading
+import time as time_module
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Modos de execução aceitos por `TaskGraph.run`
+EXECUTORS = ('serial', 'thread', 'process')
+
+class TaskError(Exception):
+    """Falha de uma ou mais tarefas de um `TaskGraph`."""
+
+    def __init__(self, errors, results):
+        """
+        Args:
+            errors (dict): Nome da tarefa → exceção (falha, timeout ou cancelamento).
+            results (dict): Resultados das tarefas concluídas com sucesso.
+        """
+        self.errors = errors
+        self.results = results
+        summary = '; '.join(f"{name}: {type(e).__name__}: {e}" for name, e in errors.items())
+        super().__init__(f"{len(errors)} tarefa(s) sem resultado: {summary}")
+
+class TaskTimeoutError(TimeoutError):
+    """A tarefa excedeu o seu tempo limite."""
+
+class TaskCancelledError(Exception):
+    """A tarefa não foi executada (dependência falhou ou o grafo foi cancelado)."""
+
+class _Task:
+    __slots__ = ('name', 'func', 'args', 'kwargs', 'deps', 'timeout', 'inline')
+
+    def __init__(self, name, func, args, kwargs, deps, timeout, inline):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.deps = deps
+        self.timeout = timeout
+        self.inline = inline
+
+def _call(func, args, kwargs):
+    return func(*args, **kwargs)
+
+class TaskGraph:
+    """
+    Grafo de tarefas com dependências, executado em série ou em um pool.
+
+    Cada tarefa recebe, antes dos seus próprios argumentos posicionais, os
+    resultados das dependências na ordem em que foram declaradas. As tarefas
+    prontas são submetidas assim que todas as dependências terminam, sem
+    passar do número de trabalhadores, de modo que o tempo limite de cada
+    tarefa começa a contar quando ela de fato inicia.
+
+    Uma tarefa que falha ou excede o tempo limite cancela as suas
+    dependentes; as demais seguem normalmente. Uma chamada a `cancel()`
+    (de outra thread) impede o início de novas tarefas. Tarefas `inline`
+    (etapas leves de agregação) rodam no processo chamador, fora do pool.
+
+    Limitações: threads não podem ser interrompidas, então uma tarefa em
+    thread que estoura o tempo limite continua executando em segundo plano
+    e o resultado é descartado; no modo 'process' os processos do pool são
+    encerrados ao final da execução se alguma tarefa estourou o tempo.
+    No modo 'process' as funções e os argumentos precisam ser serializáveis.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._cancel_event = threading.Event()
+        self.timings = {}
+
+    def add(self, name, func, args=(), kwargs=None, deps=(), timeout=None, inline=False):
+        """
+        Adiciona uma tarefa.
+
+        Args:
+            name (str): Nome único da tarefa.
+            func (callable): Função executada.
+            args (tuple): Argumentos posicionais (após os resultados das dependências).
+            kwargs (dict | None): Argumentos nomeados.
+            deps (iterable): Nomes das tarefas das quais esta depende.
+            timeout (float | None): Tempo limite em segundos.
+            inline (bool): Executa no processo chamador em vez do pool.
+
+        Returns:
+            TaskGraph: O próprio grafo, para encadear chamadas.
+        """
+        if name in self._tasks:
+            raise ValueError(f"Tarefa '{name}' já existe")
+        self._tasks[name] = _Task(name, func, tuple(args), dict(kwargs or {}), tuple(deps), timeout, inline)
+        return self
+
+    def cancel(self):
+        """Impede o início de novas tarefas; as pendentes terminam como canceladas."""
+        self._cancel_event.set()
+
+    def topological_order(self):
+        """
+        Ordem de execução compatível com as dependências (Kahn, estável pela ordem de inserção).
+
+        Raises:
+            ValueError: Se houver dependência inexistente ou ciclo.
+        """
+        for task in self._tasks.values():
+            for dep in task.deps:
+                if dep not in self._tasks:
+                    raise ValueError(f"Tarefa '{task.name}' depende de '{dep}', que não existe")
+
+        remaining = {name: len(set(task.deps)) for name, task in self._tasks.items()}
+        dependents = {name: [] for name in self._tasks}
+        for task in self._tasks.values():
+            for dep in set(task.deps):
+                dependents[dep].append(task.name)
+
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self._tasks):
+            cyclic = sorted(set(self._tasks) - set(order))
+            raise ValueError(f"Ciclo de dependências entre as tarefas: {', '.join(cyclic)}")
+        return order
+
+    def run(self, executor='thread', max_workers=None):
+        """
+        Executa o grafo e retorna os resultados.
+
+        Args:
+            executor (str): 'serial', 'thread' ou 'process'.
+            max_workers (int | None): Tamanho do pool. None usa uma thread por
+                tarefa no modo 'thread' e o número de núcleos no modo 'process'.
+
+        Returns:
+            dict: Nome da tarefa → resultado.
+
+        Raises:
+            TaskError: Se alguma tarefa falhou, estourou o tempo ou foi cancelada;
+                os resultados das demais ficam em `TaskError.results`.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Executor desconhecido: '{executor}'. Opções: {', '.join(EXECUTORS)}")
+        order = self.topological_order()
+        self._cancel_event.clear()
+        self.timings = {}
+        start = time_module.perf_counter()
+
+        if executor == 'serial':
+            results, errors = self._run_serial(order)
+        else:
+            results, errors = self._run_pool(order, executor, max_workers)
+
+        logging.info(f" TASK GRAPH ({executor}): {len(results)} tarefas concluídas, {len(errors)} sem resultado "
+                     f"em {time_module.perf_counter() - start:.3f}s")
+        if errors:
+            # A causa encadeada é a primeira falha real, não um cancelamento derivado dela
+            causes = [e for e in errors.values() if not isinstance(e, TaskCancelledError)]
+            raise TaskError(errors, results) from (causes[0] if causes else None)
+        return results
+
+    def _blocked_by(self, task, errors):
+        for dep in task.deps:
+            if dep in errors:
+                return TaskCancelledError(f"dependência '{dep}' não produziu resultado")
+        if self._cancel_event.is_set():
+            return TaskCancelledError("execução cancelada")
+        return None
+
+    def _run_inline(self, task, results, errors):
+        # Sem pool não há como interromper a tarefa: o tempo limite é verificado ao final
+        started = time_module.perf_counter()
+        try:
+            result = task.func(*[results[dep] for dep in task.deps], *task.args, **task.kwargs)
+        except Exception as e:
+            errors[task.name] = e
+            return
+        finally:
+            self.timings[task.name] = time_module.perf_counter() - started
+        if task.timeout is not None and self.timings[task.name] > task.timeout:
+            errors[task.name] = TaskTimeoutError(f"'{task.name}' levou {self.timings[task.name]:.3f}s "
+                                                 f"(limite {task.timeout}s)")
+        else:
+            results[task.name] = result
+
+    def _run_serial(self, order):
+        results = {}
+        errors = {}
+        for name in order:
+            task = self._tasks[name]
+            blocked = self._blocked_by(task, errors)
+            if blocked is not None:
+                errors[name] = blocked
+                continue
+            self._run_inline(task, results, errors)
+        return results, errors
+
+    def _run_pool(self, order, executor, max_workers):
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+        if executor == 'thread':
+            # Threads não custam núcleos: por padrão, todas as tarefas do pool podem rodar juntas
+            workers = max_workers or max(sum(not self._tasks[name].inline for name in order), 1)
+            pool = ThreadPoolExecutor(max_workers=workers)
+        else:
+            from decorators import worker_logging_initializer
+
+            # Os trabalhadores encaminham os registros de log ao processo principal
+            workers = max_workers or os.cpu_count() or 1
+            log_initializer, log_args = worker_logging_initializer()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=log_initializer, initargs=log_args)
+
+        results = {}
+        errors = {}
+        pending = list(order)
+        running = {}
+        timed_out = False
+        try:
+            while pending or running:
+                # Submete as tarefas prontas, respeitando o número de trabalhadores
+                for name in list(pending):
+                    task = self._tasks[name]
+                    blocked = self._blocked_by(task, errors)
+                    if blocked is not None:
+                        errors[name] = blocked
+                        pending.remove(name)
+                        continue
+                    if any(dep not in results for dep in task.deps):
+                        continue
+                    if task.inline:
+                        pending.remove(name)
+                        self._run_inline(task, results, errors)
+                        continue
+                    if len(running) >= workers:
+                        continue
+                    args = (*[results[dep] for dep in task.deps], *task.args)
+                    future = pool.submit(_call, task.func, args, task.kwargs)
+                    running[future] = (name, time_module.perf_counter())
+                    pending.remove(name)
+
+                if not running:
+                    continue
+
+                now = time_module.perf_counter()
+                deadlines = [started + self._tasks[name].timeout - now
+                             for name, started in running.values()
+                             if self._tasks[name].timeout is not None]
+                wait_time = max(min(deadlines), 0) if deadlines else None
+                done, _ = wait(list(running), timeout=wait_time, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, started = running.pop(future)
+                    self.timings[name] = time_module.perf_counter() - started
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        errors[name] = e
+
+                now = time_module.perf_counter()
+                for future, (name, started) in list(running.items()):
+                    timeout = self._tasks[name].timeout
+                    if timeout is not None and now - started >= timeout:
+                        del running[future]
+                        future.cancel()
+                        timed_out = True
+                        self.timings[name] = now - started
+                        errors[name] = TaskTimeoutError(f"'{name}' excedeu o limite de {timeout}s")
+        finally:
+            if timed_out and executor == 'process':
+                # Processos presos em tarefas expiradas não terminam sozinhos
+                for process in list(getattr(pool, '_processes', {}).values()):
+                    process.terminate()
+            pool.shutdown(wait=not timed_out, cancel_futures=True)
+        return results, errors